@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Task
+from django.contrib.auth.models import User
+from django.db.models import Q
+from .models import RevokedToken, Task
 
 # Register your models here.
 
@@ -31,11 +33,34 @@ class TaskAdmin(admin.ModelAdmin):
     
     def is_overdue(self, obj):
         """Exibe se a tarefa está atrasada"""
-        return obj.is_overdue()
+        return obj.overdue
     is_overdue.boolean = True
+    is_overdue.admin_order_field = 'overdue'
     is_overdue.short_description = 'Atrasada'
     
+    def get_search_results(self, request, queryset, search_term):
+        """Busca textual em título/descrição (índice GIN) ou prefixo do username"""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        # Os ids dos usuários vêm antes, numa consulta à parte: um OR com a coluna
+        # da tabela de usuários (join) impediria o uso do índice GIN em tasks
+        user_ids = list(
+            User.objects.filter(username__istartswith=search_term).values_list('pk', flat=True)
+        )
+        return queryset.matching(search_term, Q(user_id__in=user_ids)), False
+    
     def get_queryset(self, request):
         """Otimiza a query para incluir informações do usuário"""
         qs = super().get_queryset(request)
-        return qs.select_related('user')
+        return qs.select_related('user').with_overdue()
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    """Tokens revogados; incluir um `jti` aqui revoga um token vazado"""
+    
+    list_display = ['jti', 'user', 'revoked_at', 'expires_at']
+    search_fields = ['jti', 'user__username']
+    raw_id_fields = ['user']
+    readonly_fields = ['revoked_at']
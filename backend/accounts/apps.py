@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        # Registra os receivers de sinais do app
+        from . import signals  # noqa: F401
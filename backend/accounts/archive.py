@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import bump_task_version
+from .models import CLOSED_STATUSES, ArchivedTask, Task
+
+# Colunas copiadas da tarefa para o arquivo, além do id
+COPIED_FIELDS = (
+    'title', 'description', 'priority', 'status', 'due_date',
+    'created_at', 'updated_at', 'completed_at', 'user_id',
+)
+
+
+def archive_cutoff(days):
+    """Tarefas encerradas sem alterações desde este momento vão para o arquivo"""
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_batch(before, batch_size):
+    """
+    Move um lote de tarefas encerradas antes de `before` para `tasks_archive`.
+
+    Cópia e remoção acontecem na mesma transação, então o processo pode ser
+    interrompido a qualquer momento e retomado depois: o próximo lote começa nas
+    tarefas que ainda estão em `tasks`. `updated_at` conta o tempo desde o
+    encerramento (tarefas canceladas não têm `completed_at`). Não gera tombstones:
+    para a sincronização a tarefa continua existindo. Retorna quantas moveu.
+    """
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.filter(status__in=CLOSED_STATUSES, updated_at__lt=before)
+            .select_for_update(skip_locked=True)
+            .order_by('updated_at', 'id')
+            .values('id', *COPIED_FIELDS)[:batch_size]
+        )
+        if not tasks:
+            return 0
+        ArchivedTask.objects.bulk_create([ArchivedTask(**task) for task in tasks], ignore_conflicts=True)
+        Task.objects.filter(pk__in=[task['id'] for task in tasks]).delete()
+    # Listagens e estatísticas em cache ainda contêm as tarefas movidas
+    for user_id in {task['user_id'] for task in tasks}:
+        bump_task_version(user_id)
+    return len(tasks)
@@ -0,0 +1,178 @@
+import asyncio
+import json
+from functools import wraps
+
+from django.db import close_old_connections
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated, NotFound
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from .authentication import CachedJWTAuthentication
+from .cache import aget_task_stats
+from .executors import ExecutorSaturated, login_executor
+from .models import Task
+from .pagination import TaskCursorPagination
+from .ratelimit import acheck_rate_limit
+from .serializers import FastTaskSerializer
+
+
+def obtain_token_pair(data):
+    """
+    Valida as credenciais e gera o par de tokens, como o TokenObtainPairView.
+
+    Roda numa thread do login_executor, que tem sua própria conexão com o banco.
+    """
+    close_old_connections()
+    try:
+        serializer = TokenObtainPairSerializer(data=data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        return 200, serializer.validated_data
+    except APIException as exc:
+        if isinstance(exc.detail, (list, dict)):
+            return exc.status_code, exc.detail
+        return exc.status_code, {'detail': exc.detail}
+    finally:
+        close_old_connections()
+
+
+@csrf_exempt
+@require_POST
+async def login_view(request):
+    """
+    Login assíncrono: a verificação da senha roda no login_executor, com número
+    limitado de threads e de requisições na fila. Quando ele está saturado, o
+    login é recusado com 503 na hora, sem ocupar os workers das outras rotas.
+    """
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'detail': 'JSON inválido.'}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({'detail': 'JSON inválido.'}, status=400)
+    else:
+        data = request.POST.dict()
+
+    wait = await acheck_rate_limit('login', request, str(data.get('username') or ''))
+    if wait:
+        return JsonResponse(
+            {'detail': 'Muitas tentativas de login, tente novamente mais tarde.'},
+            status=429, headers={'Retry-After': str(wait)},
+        )
+
+    try:
+        future = login_executor.submit(obtain_token_pair, data)
+    except ExecutorSaturated:
+        return JsonResponse(
+            {'detail': 'Muitas tentativas de login simultâneas, tente novamente.'},
+            status=503, headers={'Retry-After': '1'},
+        )
+
+    status_code, payload = await asyncio.wrap_future(future)
+    response = JsonResponse(payload, status=status_code)
+    if status_code == AuthenticationFailed.status_code:
+        response['WWW-Authenticate'] = 'Bearer realm="api"'
+    return response
+
+
+def render(data, status=200):
+    """Renderiza com o renderer JSON das views síncronas (o primeiro configurado), com saída idêntica"""
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    return HttpResponse(renderer.render(data), status=status, content_type='application/json')
+
+
+def api_error(exc):
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    response = render(data, exc.status_code)
+    if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+        response['WWW-Authenticate'] = 'Bearer realm="api"'
+    return response
+
+
+def async_api_view(view):
+    """
+    Adapta uma view async ao comportamento das views da API: aceita só GET,
+    autentica por JWT sem bloquear o event loop e converte erros da API em JSON.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return HttpResponseNotAllowed(['GET'])
+        try:
+            result = await CachedJWTAuthentication().aauthenticate(request)
+            if result is None:
+                raise NotAuthenticated()
+            api_request = Request(request)
+            api_request.user = result[0]
+            return await view(api_request, *args, **kwargs)
+        except APIException as exc:
+            return api_error(exc)
+    return wrapper
+
+
+def user_tasks(request):
+    return Task.objects.filter(user=request.user)
+
+
+async def paginated_response(request, queryset):
+    paginator = TaskCursorPagination()
+    page = await paginator.apaginate_queryset(FastTaskSerializer.values(queryset), request)
+    return render(paginator.get_paginated_data(FastTaskSerializer(page).data))
+
+
+@async_api_view
+async def task_list(request):
+    """Versão async de TaskViewSet.list"""
+    return await paginated_response(request, user_tasks(request))
+
+
+@async_api_view
+async def task_detail(request, pk):
+    """Versão async de TaskViewSet.retrieve"""
+    try:
+        row = await FastTaskSerializer.values(user_tasks(request)).aget(pk=pk)
+    except Task.DoesNotExist:
+        raise NotFound('No Task matches the given query.')
+    return render(FastTaskSerializer([row]).data[0])
+
+
+@async_api_view
+async def completed_tasks(request):
+    """Versão async de TaskViewSet.completed"""
+    return await paginated_response(request, user_tasks(request).filter(status='completed'))
+
+
+@async_api_view
+async def pending_tasks(request):
+    """Versão async de TaskViewSet.pending"""
+    return await paginated_response(request, user_tasks(request).filter(status='pending'))
+
+
+@async_api_view
+async def overdue_tasks(request):
+    """Versão async de TaskViewSet.overdue"""
+    return await paginated_response(request, user_tasks(request).overdue())
+
+
+@async_api_view
+async def tasks_by_priority(request):
+    """Versão async de TaskViewSet.by_priority"""
+    tasks = user_tasks(request)
+    priority = request.query_params.get('priority', None)
+    if priority:
+        tasks = tasks.with_code('priority', priority)
+    return await paginated_response(request, tasks)
+
+
+@async_api_view
+async def task_stats(request):
+    """Versão async de TaskStatsView"""
+    return render(await aget_task_stats(request.user))
@@ -0,0 +1,133 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .revocation import revoked_tokens
+
+
+class UserCache:
+    """
+    Cache LRU em memória, com TTL, dos usuários já autenticados neste processo.
+
+    Cada worker tem o seu próprio cache: a invalidação por sinal só alcança o
+    processo onde a escrita aconteceu, e o TTL limita o atraso nos demais.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user):
+        expires_at = time.monotonic() + settings.AUTH_USER_CACHE_TTL
+        with self._lock:
+            self._entries[user_id] = (user, expires_at)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > settings.AUTH_USER_CACHE_MAX_SIZE:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que reaproveita o usuário já carregado em vez de consultar
+    o banco a cada requisição, e rejeita tokens revogados (ver revocation.py).
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        revoked_tokens.sync()
+        self.check_revoked(validated_token)
+        return validated_token
+
+    def check_revoked(self, validated_token):
+        if validated_token.get(api_settings.JTI_CLAIM) in revoked_tokens:
+            raise InvalidToken(_("Token is revoked"))
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get(user_id)
+        if user is None:
+            # A busca padrão já rejeita usuários inativos e senhas alteradas
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        else:
+            self.check_password_changed(validated_token, user)
+
+        # Cada requisição recebe sua própria cópia, sem compartilhar estado
+        return copy.copy(user)
+
+    async def aauthenticate(self, request):
+        """Versão assíncrona de authenticate(), para as views async"""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = super().get_validated_token(raw_token)
+        await revoked_tokens.async_sync()
+        self.check_revoked(validated_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            if not user.is_active:
+                raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+            user_cache.set(user_id, user)
+        self.check_password_changed(validated_token, user)
+        return copy.copy(user)
+
+    def check_password_changed(self, validated_token, user):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
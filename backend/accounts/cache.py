@@ -0,0 +1,179 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+from .db_router import pin_to_primary
+from .metrics import registry
+from .models import ArchivedTask, Task
+
+# Cada usuário tem uma versão das suas tarefas, incrementada a cada escrita.
+# As entradas de cache derivadas (estatísticas, listagens, ETags) incluem a versão na chave,
+# então uma escrita invalida todas de uma vez, sem precisar apagá-las.
+
+
+def _version_key(user_id):
+    return f'task_version:{user_id}'
+
+
+def _stats_key(user_id, version, archived=False):
+    return f'task_stats:{user_id}:{version}:{int(archived)}'
+
+
+def _next_due_key(user_id, version):
+    return f'task_next_due:{user_id}:{version}'
+
+
+def _response_key(user_id, version, marker, variant):
+    return f'task_response:{user_id}:{version}:{marker}:{variant}'
+
+
+def _initial_version():
+    # Se a versão sair do cache, recomeça de um valor que nunca foi usado
+    return time.time_ns()
+
+
+def get_task_version(user_id):
+    """Retorna a versão atual das tarefas do usuário"""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = _initial_version()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+async def aget_task_version(user_id):
+    """Versão assíncrona de get_task_version()"""
+    key = _version_key(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = _initial_version()
+        if not await cache.aadd(key, version, timeout=None):
+            version = await cache.aget(key, version)
+    return version
+
+
+def bump_task_version(user_id):
+    """
+    Marca as tarefas do usuário como alteradas, invalidando os caches derivados.
+
+    Antes, fixa o usuário no primário: as entradas da versão nova não podem ser
+    preenchidas com leituras de uma réplica atrasada. Vale também para escritas
+    fora das requisições (archive_tasks, admin, shell), que o middleware não vê.
+    """
+    pin_to_primary(user_id)
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        cache.set(_version_key(user_id), _initial_version(), timeout=None)
+
+
+def _timeout_until(moment):
+    timeout = settings.TASK_STATS_CACHE_TIMEOUT
+    if moment is not None:
+        seconds = (moment - timezone.now()).total_seconds()
+        timeout = max(1, min(timeout, int(seconds) + 1))
+    return timeout
+
+
+def _add_stats(stats, other):
+    """Soma os contadores de dois resultados de stats()"""
+    return {
+        name: _add_stats(value, other[name]) if isinstance(value, dict) else value + other[name]
+        for name, value in stats.items()
+    }
+
+
+def get_task_stats(user, include_archived=False):
+    """
+    Retorna as estatísticas das tarefas do usuário, usando o cache quando possível.
+
+    A entrada expira no próximo vencimento de uma tarefa em aberto, já que nesse
+    momento o contador de tarefas atrasadas muda sem nenhuma escrita no banco.
+    Com `include_archived`, soma também as tarefas arquivadas (todas encerradas).
+    """
+    key = _stats_key(user.pk, get_task_version(user.pk), include_archived)
+    stats = cache.get(key)
+    if stats is None:
+        stats = Task.objects.filter(user=user).stats()
+        next_due = stats.pop('next_due')
+        if include_archived:
+            archived = ArchivedTask.objects.filter(user=user).stats()
+            archived.pop('next_due')
+            stats = _add_stats(stats, archived)
+        cache.set(key, stats, _timeout_until(next_due))
+    return stats
+
+
+async def aget_task_stats(user):
+    """Versão assíncrona de get_task_stats()"""
+    key = _stats_key(user.pk, await aget_task_version(user.pk))
+    stats = await cache.aget(key)
+    if stats is None:
+        stats = await Task.objects.filter(user=user).astats()
+        next_due = stats.pop('next_due')
+        await cache.aset(key, stats, _timeout_until(next_due))
+    return stats
+
+
+def get_task_state(user_id):
+    """
+    Retorna (versão, próximo vencimento) das tarefas do usuário.
+
+    O campo `is_overdue` muda quando um vencimento passa, sem escrita no banco;
+    o próximo vencimento de uma tarefa não concluída marca esse momento, então o
+    par identifica o estado de tudo o que as respostas de tarefas exibem.
+    """
+    version = get_task_version(user_id)
+    key = _next_due_key(user_id, version)
+    now = timezone.now()
+    entry = cache.get(key)
+    if entry is None or (entry[0] is not None and entry[0] <= now):
+        next_due = (
+            Task.objects.filter(user_id=user_id, due_date__gt=now)
+            .exclude(status='completed')
+            .aggregate(next_due=Min('due_date'))['next_due']
+        )
+        entry = (next_due,)
+        cache.set(key, entry, _timeout_until(next_due))
+    return version, entry[0]
+
+
+def normalize_query(request):
+    """Query string em forma canônica: parâmetros ordenados e sem valores vazios"""
+    params = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+        if value != ''
+    )
+    return urlencode(params)
+
+
+def get_cached_response(request, build):
+    """
+    Retorna os dados de uma listagem de tarefas, usando o cache quando possível.
+
+    A chave combina usuário, versão das tarefas, próximo vencimento, endpoint e a
+    query string normalizada; `build` só é chamado em caso de falha no cache.
+    """
+    version, next_due = get_task_state(request.user.pk)
+    marker = int(next_due.timestamp() * 1_000_000) if next_due else 0
+    # O host entra na chave porque os links de paginação são absolutos
+    variant = '|'.join([request.get_host(), request.path, normalize_query(request)])
+    digest = hashlib.md5(variant.encode(), usedforsecurity=False).hexdigest()
+    key = _response_key(request.user.pk, version, marker, digest)
+
+    data = cache.get(key)
+    if data is None:
+        registry.inc('task_response_cache_total', (('result', 'miss'),))
+        data = build()
+        cache.set(key, data, settings.TASK_RESPONSE_CACHE_TIMEOUT)
+    else:
+        registry.inc('task_response_cache_total', (('result', 'hit'),))
+    return data
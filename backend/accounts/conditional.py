@@ -0,0 +1,106 @@
+import hashlib
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from .cache import get_task_state, get_task_version
+from .models import Task
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+    default_detail = 'Não modificado.'
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'As tarefas foram alteradas desde a última leitura.'
+    default_code = 'precondition_failed'
+
+
+def build_etag(request, version, marker):
+    """Monta o ETag a partir do estado das tarefas e da representação pedida"""
+    variant = '|'.join([
+        str(request.user.pk),
+        request.path,
+        request.META.get('QUERY_STRING', ''),
+        request.META.get('HTTP_ACCEPT', ''),
+    ])
+    digest = hashlib.md5(variant.encode(), usedforsecurity=False).hexdigest()[:16]
+    return f'"t{version}.{marker}.{digest}"'
+
+
+def task_etag(request):
+    """
+    ETag forte das respostas de tarefas, calculado sem serializar nada.
+
+    Combina a versão das tarefas do usuário e o próximo vencimento (que muda
+    `is_overdue` sem escrita) com um resumo da URL e do Accept, que distinguem as
+    representações.
+    """
+    version, next_due = get_task_state(request.user.pk)
+    marker = int(next_due.timestamp() * 1_000_000) if next_due else 0
+    return build_etag(request, version, marker)
+
+
+def parse_etags(header):
+    return [tag.strip().removeprefix('W/') for tag in header.split(',') if tag.strip()]
+
+
+class TaskConditionalMixin:
+    """
+    Requisições condicionais para views de tarefas.
+
+    GET/HEAD com If-None-Match igual ao ETag atual recebem 304 antes de qualquer
+    consulta ou serialização das tarefas (com `*`, só se a tarefa pedida existe). Escritas com If-Match recebem 412 se as
+    tarefas do usuário mudaram desde a leitura que gerou o ETag.
+    """
+
+    etag = None
+
+    def get_etag(self, request):
+        return task_etag(request)
+
+    def representation_exists(self, request):
+        """
+        Se há uma representação atual, sem a qual If-None-Match: * não casa (RFC 9110).
+        Listas e estatísticas sempre têm; nas rotas de detalhe, a tarefa precisa existir.
+        """
+        if 'pk' not in self.kwargs:
+            return True
+        try:
+            return Task.objects.filter(pk=self.kwargs['pk'], user=request.user).exists()
+        except (TypeError, ValueError):
+            return False
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            self.etag = self.get_etag(request)
+            if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+            if if_none_match:
+                tags = parse_etags(if_none_match)
+                if self.etag in tags or ('*' in tags and self.representation_exists(request)):
+                    raise NotModified()
+        else:
+            if_match = request.META.get('HTTP_IF_MATCH')
+            if if_match:
+                tags = parse_etags(if_match)
+                # Compara só a versão: qualquer escrita do usuário invalida o ETag
+                prefix = f'"t{get_task_version(request.user.pk)}.'
+                if '*' not in tags and not any(tag.startswith(prefix) for tag in tags):
+                    raise PreconditionFailed()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': self.etag})
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.etag and request.method in SAFE_METHODS and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = self.etag
+        return response
@@ -0,0 +1,138 @@
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.decorators import sync_and_async_middleware
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RoutingState:
+    """Estado de roteamento da requisição atual"""
+
+    def __init__(self):
+        self.use_replica = False
+        self.wrote = False
+
+
+routing_state = ContextVar('routing_state', default=None)
+
+# alias -> (saudável, instante da última verificação)
+_replica_health = {}
+
+
+def _sticky_key(user_id):
+    return f'db_primary_sticky:{user_id}'
+
+
+def is_pinned_to_primary(user_id):
+    return cache.get(_sticky_key(user_id)) is not None
+
+
+def pin_to_primary(user_id):
+    """Manda as leituras do usuário para o primário por DB_PRIMARY_STICKY_SECONDS"""
+    cache.set(_sticky_key(user_id), True, settings.DB_PRIMARY_STICKY_SECONDS)
+
+
+def is_healthy(alias):
+    """Verifica a réplica no máximo a cada DB_REPLICA_HEALTH_CHECK_INTERVAL segundos"""
+    healthy, checked_at = _replica_health.get(alias, (True, None))
+    now = time.monotonic()
+    if checked_at is not None and now - checked_at < settings.DB_REPLICA_HEALTH_CHECK_INTERVAL:
+        return healthy
+    connection = connections[alias]
+    try:
+        if connection.connection is None:
+            connection.ensure_connection()
+            healthy = True
+        else:
+            healthy = connection.is_usable()
+    except DatabaseError:
+        healthy = False
+    _replica_health[alias] = (healthy, now)
+    return healthy
+
+
+class ReplicaRouter:
+    """
+    Envia leituras às réplicas só quando a view liberou (ReplicaReadMixin) e o
+    usuário não escreveu há pouco; todo o resto, inclusive escritas, vai ao primário.
+
+    Uma escrita marca a requisição, então as leituras seguintes dela também vão ao
+    primário, e ao final o usuário fica fixado no primário por alguns segundos
+    (replica_routing_middleware), para ler o que acabou de gravar.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if state is None or not state.use_replica or state.wrote:
+            return DEFAULT_DB_ALIAS
+        replicas = [alias for alias in settings.DATABASE_REPLICAS if is_healthy(alias)]
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas têm os mesmos dados do primário
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+def _finish(request, state):
+    user = getattr(request, 'user', None)
+    if state.wrote and user is not None and user.is_authenticated:
+        pin_to_primary(user.pk)
+
+
+@sync_and_async_middleware
+def replica_routing_middleware(get_response):
+    """Cria o estado de roteamento de cada requisição e fixa no primário quem escreveu"""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            state = RoutingState()
+            token = routing_state.set(state)
+            try:
+                response = await get_response(request)
+            finally:
+                routing_state.reset(token)
+            _finish(request, state)
+            return response
+    else:
+        def middleware(request):
+            state = RoutingState()
+            token = routing_state.set(state)
+            try:
+                response = get_response(request)
+            finally:
+                routing_state.reset(token)
+            _finish(request, state)
+            return response
+    return middleware
+
+
+class ReplicaReadMixin:
+    """
+    Libera leituras em réplica para as ações de `replica_actions` (ou todos os GETs
+    de uma APIView sem actions), depois da autenticação.
+    """
+
+    replica_actions = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        state = routing_state.get()
+        if state is None or request.method not in SAFE_METHODS:
+            return
+        if self.replica_actions is not None and getattr(self, 'action', None) not in self.replica_actions:
+            return
+        state.use_replica = not (request.user.is_authenticated and is_pinned_to_primary(request.user.pk))
@@ -0,0 +1,57 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+class ExecutorSaturated(Exception):
+    """Executor sem vaga livre: todos os workers ocupados e a fila cheia"""
+
+
+class BoundedExecutor:
+    """
+    Pool de threads com fila limitada, que rejeita novas tarefas em vez de enfileirar
+    indefinidamente.
+
+    Usado para isolar trabalho caro de CPU (como a verificação de senhas) do resto
+    da API: quando o pool satura, a requisição falha rápido em vez de esperar.
+    """
+
+    def __init__(self, name, workers_setting, queue_setting):
+        self.name = name
+        self.workers_setting = workers_setting
+        self.queue_setting = queue_setting
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def _setup(self):
+        with self._lock:
+            if self._executor is None:
+                workers = getattr(settings, self.workers_setting)
+                queue_size = getattr(settings, self.queue_setting)
+                self._slots = threading.BoundedSemaphore(workers + queue_size)
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=self.name)
+
+    def submit(self, fn, *args, **kwargs):
+        if self._executor is None:
+            self._setup()
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorSaturated(self.name)
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+# Verificação de senha (PBKDF2) do login
+login_executor = BoundedExecutor('login', 'LOGIN_EXECUTOR_WORKERS', 'LOGIN_EXECUTOR_QUEUE_SIZE')
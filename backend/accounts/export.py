@@ -0,0 +1,25 @@
+import csv
+
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class Echo:
+    """Pseudo-arquivo que devolve a linha escrita, para usar csv.writer em streaming"""
+
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(rows):
+    """Gera uma linha JSON por tarefa"""
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+
+def csv_lines(rows, fields):
+    """Gera o cabeçalho e uma linha CSV por tarefa"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([row[field] for field in fields])
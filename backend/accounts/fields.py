@@ -0,0 +1,47 @@
+from django.core import exceptions
+from django.db import models
+
+
+class CodeChoiceField(models.PositiveSmallIntegerField):
+    """
+    Campo de choices com códigos texto armazenados como inteiro pequeno.
+
+    No Python (models, filtros, serializers) o valor continua sendo o código, como
+    'high'; no banco é a posição do código em `choices`, começando em 1. Assim a
+    coluna ocupa 2 bytes e ordenar pelo campo segue a ordem de `choices` (por
+    exemplo, de prioridade), atendida por índice. Novos códigos devem entrar no
+    final de `choices`, para não mudar os valores já gravados.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.codes = [code for code, label in self.choices or ()]
+
+    @property
+    def validators(self):
+        # Os limites de inteiro não se aplicam ao código; `choices` já valida o valor
+        return list(self._validators)
+
+    def get_prep_value(self, value):
+        if value is None or isinstance(value, int):
+            return value
+        try:
+            return self.codes.index(value) + 1
+        except ValueError:
+            raise ValueError(f'Campo {self.name!r} esperava um de {self.codes}, recebeu {value!r}.')
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return self.codes[value - 1]
+
+    def to_python(self, value):
+        if value is None:
+            return value
+        if isinstance(value, int) and not isinstance(value, bool) and 0 < value <= len(self.codes):
+            return self.codes[value - 1]
+        if value in self.codes:
+            return value
+        raise exceptions.ValidationError(
+            self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value},
+        )
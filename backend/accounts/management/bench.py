@@ -0,0 +1,15 @@
+import time
+
+
+class Rollback(Exception):
+    """Desfaz os dados criados para o benchmark"""
+
+
+def measure(func, repeat):
+    """Melhor tempo, em segundos, de `repeat` execuções de `func`"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
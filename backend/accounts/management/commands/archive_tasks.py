@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.archive import archive_batch, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        'Move as tarefas concluídas/canceladas há mais de N dias para tasks_archive, '
+        'em lotes; pode ser interrompido e executado de novo para continuar'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.TASK_ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=settings.TASK_ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, help='Para depois deste número de lotes')
+        parser.add_argument('--sleep', type=float, default=0.0, help='Pausa entre lotes, em segundos')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['batch_size'] < 1:
+            raise CommandError('--days não pode ser negativo e --batch-size precisa ser maior que zero.')
+        # O corte é fixo durante a execução, para o comando terminar mesmo com tarefas sendo encerradas
+        before = archive_cutoff(options['days'])
+        start = time.perf_counter()
+        total = batches = 0
+        while options['max_batches'] is None or batches < options['max_batches']:
+            moved = archive_batch(before, options['batch_size'])
+            if not moved:
+                break
+            total += moved
+            batches += 1
+            self.stdout.write(f'lote {batches}: {moved} tarefas arquivadas')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} tarefas arquivadas em {batches} lotes ({elapsed:.1f}s)'
+        ))
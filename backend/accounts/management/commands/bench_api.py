@@ -0,0 +1,269 @@
+import json
+import math
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import Task
+from accounts.revocation import revoked_tokens
+
+PASSWORD = 'senha-forte-123'
+
+
+@contextmanager
+def count_queries():
+    """
+    Conta as consultas em todas as conexões, já que as leituras podem ir às
+    réplicas (ver db_router.py), sem abrir conexão com as que não forem usadas
+    """
+    counted = [0]
+
+    def count(execute, sql, params, many, context):
+        counted[0] += 1
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(count))
+        yield counted
+
+
+def percentile(values, p):
+    """Percentil pelo método nearest-rank"""
+    values = sorted(values)
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+class Session:
+    """Usuário semeado, com seus tokens e uma tarefa fixa para as rotas de detalhe"""
+
+    def __init__(self, user, task_id):
+        self.user = user
+        self.task_id = task_id
+        refresh = RefreshToken.for_user(user)
+        self.refresh = str(refresh)
+        self.header = f'Bearer {refresh.access_token}'
+
+    def new_task(self):
+        return Task.objects.create(user=self.user, title='Bench').pk
+
+    def new_tokens(self):
+        """(cabeçalho Authorization, refresh) novos, para o logout não revogar os da sessão"""
+        refresh = RefreshToken.for_user(self.user)
+        return f'Bearer {refresh.access_token}', str(refresh)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede latência (p50/p95/p99), vazão e consultas SQL de cada rota da API sobre '
+        'N usuários × M tarefas, e falha se alguma rota estourar o orçamento configurado'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--tasks', type=int, default=1000, help='Tarefas por usuário')
+        parser.add_argument('--requests', type=int, default=50, help='Requisições por rota')
+        parser.add_argument('--budgets', default=str(settings.BASE_DIR / 'bench_budgets.json'))
+        parser.add_argument('--output', help='Grava os resultados neste arquivo JSON')
+        parser.add_argument('--compare', help='Resultados JSON de uma execução anterior')
+
+    def endpoints(self):
+        """
+        (nome, método, função que recebe a sessão e o índice e retorna (url, corpo)
+        ou (url, corpo, cabeçalho Authorization) para não usar o da sessão)
+        """
+        tasks = reverse('task-list')
+        return [
+            ('register', 'post', lambda s, i: (reverse('register'), {
+                'username': f'{self.prefix}-new-{i}', 'email': f'{self.prefix}-new-{i}@bench.local',
+                'password': PASSWORD,
+            })),
+            ('login', 'post', lambda s, i: (reverse('token_obtain_pair'), {
+                'username': s.user.username, 'password': PASSWORD,
+            })),
+            ('token_refresh', 'post', lambda s, i: (reverse('token_refresh'), {'refresh': s.refresh})),
+            ('logout', 'post', self.logout),
+            ('protected', 'get', lambda s, i: (reverse('protected'), None)),
+            ('users', 'get', lambda s, i: (reverse('users'), None)),
+            ('users_search', 'get', lambda s, i: (reverse('users') + f'?search={self.prefix}', None)),
+            ('api_root', 'get', lambda s, i: (reverse('api-root'), None)),
+            ('tasks_list', 'get', lambda s, i: (tasks, None)),
+            ('tasks_list_ordering', 'get', lambda s, i: (tasks + '?ordering=-priority,due_date', None)),
+            ('tasks_create', 'post', lambda s, i: (tasks, {'title': f'Bench {i}', 'priority': 'high'})),
+            ('tasks_retrieve', 'get', lambda s, i: (f'{tasks}{s.task_id}/', None)),
+            ('tasks_partial_update', 'patch', lambda s, i: (f'{tasks}{s.task_id}/', {'title': f'Bench {i}'})),
+            ('tasks_destroy', 'delete', lambda s, i: (f'{tasks}{s.new_task()}/', None)),
+            ('tasks_mark_completed', 'patch', lambda s, i: (reverse('task-mark-completed', args=[s.task_id]), None)),
+            ('tasks_bulk', 'post', lambda s, i: (reverse('task-bulk'), {
+                'create': [{'title': f'Bench {i}'}],
+                'update': [{'id': s.task_id, 'status': 'pending'}],
+                'delete': [s.new_task()],
+            })),
+            ('tasks_completed', 'get', lambda s, i: (reverse('task-completed'), None)),
+            ('tasks_completed_archived', 'get', lambda s, i: (
+                reverse('task-completed') + '?include_archived=true', None)),
+            ('tasks_pending', 'get', lambda s, i: (reverse('task-pending'), None)),
+            ('tasks_overdue', 'get', lambda s, i: (reverse('task-overdue'), None)),
+            ('tasks_by_priority', 'get', lambda s, i: (reverse('task-by-priority') + '?priority=high', None)),
+            ('tasks_search', 'get', lambda s, i: (reverse('task-search') + '?q=relatório', None)),
+            ('tasks_sync', 'get', lambda s, i: (reverse('task-sync'), None)),
+            ('my_tasks', 'get', lambda s, i: (reverse('my-tasks') + '?status=pending', None)),
+            ('my_tasks_create', 'post', lambda s, i: (reverse('my-tasks'), {'title': f'Bench {i}'})),
+            ('my_task_get', 'get', lambda s, i: (reverse('task-detail', args=[s.task_id]), None)),
+            ('my_task_put', 'put', lambda s, i: (reverse('task-detail', args=[s.task_id]), {'title': f'Bench {i}'})),
+            ('my_task_delete', 'delete', lambda s, i: (reverse('task-detail', args=[s.new_task()]), None)),
+            ('export_ndjson', 'get', lambda s, i: (reverse('task-export'), None)),
+            ('export_csv', 'get', lambda s, i: (reverse('task-export') + '?output=csv', None)),
+            ('stats', 'get', lambda s, i: (reverse('task-stats'), None)),
+            ('stats_archived', 'get', lambda s, i: (reverse('task-stats') + '?include_archived=true', None)),
+            ('async_list', 'get', lambda s, i: (reverse('async-task-list'), None)),
+            ('async_completed', 'get', lambda s, i: (reverse('async-task-completed'), None)),
+            ('async_pending', 'get', lambda s, i: (reverse('async-task-pending'), None)),
+            ('async_overdue', 'get', lambda s, i: (reverse('async-task-overdue'), None)),
+            ('async_by_priority', 'get', lambda s, i: (reverse('async-task-by-priority') + '?priority=high', None)),
+            ('async_detail', 'get', lambda s, i: (reverse('async-task-detail', args=[s.task_id]), None)),
+            ('async_stats', 'get', lambda s, i: (reverse('async-task-stats'), None)),
+        ]
+
+    def logout(self, session, index):
+        header, refresh = session.new_tokens()
+        return reverse('logout'), {'refresh': refresh}, header
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['tasks'] < 1 or options['requests'] < 1:
+            raise CommandError('--users, --tasks e --requests precisam ser maiores que zero.')
+        budgets = self.load_json(options['budgets'])
+        # O login verifica a senha em outra thread (outra conexão), então os dados
+        # precisam estar commitados; tudo o que tem o prefixo é removido ao final
+        self.prefix = f'bench-api-{time.time_ns()}'
+        try:
+            sessions = self.seed(options['users'], options['tasks'])
+            # A sincronização dos tokens revogados é periódica (uma consulta por
+            # intervalo, não por requisição) e fica fora da contagem das rotas;
+            # os limites de taxa recusariam as repetições de login e registro
+            revoked_tokens.reset()
+            with override_settings(JWT_REVOCATION_SYNC_INTERVAL=float('inf'), RATE_LIMITS={}):
+                results = {
+                    name: self.measure(method, build, sessions, options['requests'])
+                    for name, method, build in self.endpoints()
+                }
+        finally:
+            User.objects.filter(username__startswith=self.prefix).delete()
+
+        baseline = self.load_json(options['compare'])['endpoints'] if options['compare'] else {}
+        self.report(results, baseline)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump({
+                    'meta': {
+                        'users': options['users'],
+                        'tasks': options['tasks'],
+                        'requests': options['requests'],
+                        'database': connection.vendor,
+                        'created_at': timezone.now().isoformat(),
+                    },
+                    'endpoints': results,
+                }, output, indent=2)
+            self.stdout.write(f'Resultados gravados em {options["output"]}')
+
+        violations = self.check_budgets(results, budgets)
+        if violations:
+            raise CommandError('Orçamento estourado:\n' + '\n'.join(violations))
+        self.stdout.write(self.style.SUCCESS('Todas as rotas dentro do orçamento'))
+
+    def load_json(self, path):
+        try:
+            with open(path, encoding='utf-8') as source:
+                return json.load(source)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Não foi possível ler {path}: {exc}')
+
+    def seed(self, users, tasks):
+        password = make_password(PASSWORD)
+        User.objects.bulk_create([
+            User(username=f'{self.prefix}-{i}', email=f'{self.prefix}-{i}@bench.local', password=password)
+            for i in range(users)
+        ])
+        now = timezone.now()
+        sessions = []
+        for user in User.objects.filter(username__startswith=self.prefix).order_by('pk'):
+            created = Task.objects.bulk_create(
+                [Task(
+                    user=user,
+                    title=f'Relatório {i}' if i % 10 == 0 else f'Tarefa {i}',
+                    description='Descrição da tarefa',
+                    priority=Task.PRIORITY_CHOICES[i % 4][0],
+                    status=Task.STATUS_CHOICES[i % 4][0],
+                    due_date=now + timedelta(days=i % 30 - 10) if i % 3 else None,
+                ) for i in range(tasks)],
+                batch_size=1000,
+            )
+            sessions.append(Session(user, created[0].pk))
+        return sessions
+
+    def measure(self, method, build, sessions, total):
+        client = Client()
+        latencies, queries, statuses = [], [], set()
+        for i in range(total):
+            session = sessions[i % len(sessions)]
+            url, data, *header = build(session, i)
+            kwargs = {'HTTP_AUTHORIZATION': header[0] if header else session.header}
+            if data is not None:
+                kwargs.update(data=json.dumps(data), content_type='application/json')
+            with count_queries() as counted:
+                start = time.perf_counter()
+                response = getattr(client, method)(url, **kwargs)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                latencies.append(time.perf_counter() - start)
+            queries.append(counted[0])
+            statuses.add(response.status_code)
+        return {
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'rps': round(total / sum(latencies), 1),
+            'queries': max(queries),
+            'statuses': sorted(statuses),
+        }
+
+    def report(self, results, baseline):
+        self.stdout.write(f'{"rota":<26}{"p50":>9}{"p95":>9}{"p99":>9}{"req/s":>9}{"SQL":>5}')
+        for name, result in results.items():
+            line = (
+                f'{name:<26}{result["p50_ms"]:>9.2f}{result["p95_ms"]:>9.2f}'
+                f'{result["p99_ms"]:>9.2f}{result["rps"]:>9.1f}{result["queries"]:>5}'
+            )
+            previous = baseline.get(name)
+            if previous:
+                line += (
+                    f'   p95 {result["p95_ms"] / previous["p95_ms"]:.2f}x'
+                    f'  SQL {result["queries"] - previous["queries"]:+d}'
+                )
+            self.stdout.write(line)
+
+    def check_budgets(self, results, budgets):
+        """Lista as rotas com status de erro ou acima do orçamento de consultas/latência"""
+        violations = []
+        for name, result in results.items():
+            budget = {**budgets.get('default', {}), **budgets.get('endpoints', {}).get(name, {})}
+            errors = [status for status in result['statuses'] if status >= 400]
+            if errors:
+                violations.append(f'{name}: respondeu {errors}')
+            if 'queries' in budget and result['queries'] > budget['queries']:
+                violations.append(f'{name}: {result["queries"]} consultas (máximo {budget["queries"]})')
+            if 'p95_ms' in budget and result['p95_ms'] > budget['p95_ms']:
+                violations.append(f'{name}: p95 de {result["p95_ms"]} ms (máximo {budget["p95_ms"]} ms)')
+        return violations
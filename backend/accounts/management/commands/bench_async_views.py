@@ -0,0 +1,84 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara requisições/segundo das leituras de tarefas síncronas (WSGI, em threads) '
+        'e async (ASGI, no event loop) sob carga concorrente'
+    )
+
+    endpoints = [
+        ('list', 'task-list', 'async-task-list'),
+        ('completed', 'task-completed', 'async-task-completed'),
+        ('pending', 'task-pending', 'async-task-pending'),
+        ('overdue', 'task-overdue', 'async-task-overdue'),
+        ('by_priority', 'task-by-priority', 'async-task-by-priority'),
+        ('stats', 'task-stats', 'async-task-stats'),
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1000)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20)
+
+    def handle(self, *args, **options):
+        # As requisições rodam em outras threads/conexões, então os dados precisam
+        # estar commitados; o usuário (e suas tarefas) é removido ao final
+        user = User.objects.create(username=f'bench-async-{time.time_ns()}')
+        try:
+            Task.objects.bulk_create(
+                [Task(user=user, title=f'Tarefa {i}', status=Task.STATUS_CHOICES[i % 4][0])
+                 for i in range(options['tasks'])],
+                batch_size=1000,
+            )
+            self.header = f'Bearer {RefreshToken.for_user(user).access_token}'
+            total, concurrency = options['requests'], options['concurrency']
+            for name, sync_name, async_name in self.endpoints:
+                # As views async não têm o cache de respostas das listagens: sem ele,
+                # os dois lados consultam e serializam as tarefas a cada requisição
+                with override_settings(TASK_RESPONSE_CACHE_TIMEOUT=0):
+                    sync_rate = self.run_sync(reverse(sync_name), total, concurrency)
+                async_rate = asyncio.run(self.run_async(reverse(async_name), total, concurrency))
+                self.stdout.write(
+                    f'{name:<12} sync {sync_rate:>8.0f} req/s   async {async_rate:>8.0f} req/s   '
+                    f'({async_rate / sync_rate:.2f}x)'
+                )
+        finally:
+            user.delete()
+
+    def run_sync(self, url, total, concurrency):
+        def worker(count):
+            client = Client(HTTP_AUTHORIZATION=self.header)
+            for _ in range(count):
+                assert client.get(url).status_code == 200
+
+        counts = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(worker, counts))
+        return total / (time.perf_counter() - start)
+
+    async def run_async(self, url, total, concurrency):
+        client = AsyncClient()
+        headers = {'Authorization': self.header}
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def request():
+            async with semaphore:
+                response = await client.get(url, headers=headers)
+                assert response.status_code == 200, response.content
+
+        start = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(total)))
+        return total / (time.perf_counter() - start)
@@ -0,0 +1,63 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from accounts import renderers
+from accounts.management.bench import Rollback, measure
+from accounts.models import Task
+from accounts.serializers import TaskSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara tempo de codificação e tamanho da resposta de listas de TaskSerializer '
+        'com JSONRenderer, ORJSONRenderer e MessagePackRenderer (dados descartados ao final)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[50, 1000, 10000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        candidates = [('JSONRenderer', JSONRenderer())]
+        if renderers.orjson:
+            candidates.append(('ORJSONRenderer', renderers.ORJSONRenderer()))
+        else:
+            self.stderr.write('orjson não instalado: ORJSONRenderer fora da comparação')
+        if renderers.msgpack:
+            candidates.append(('MessagePackRenderer', renderers.MessagePackRenderer()))
+        else:
+            self.stderr.write('msgpack não instalado: MessagePackRenderer fora da comparação')
+
+        try:
+            with transaction.atomic():
+                for size in options['sizes']:
+                    self.run(size, options['repeat'], candidates)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, size, repeat, candidates):
+        user = User.objects.create(username=f'bench-renderers-{size}-{time.time_ns()}')
+        now = timezone.now()
+        Task.objects.bulk_create(
+            [Task(user=user, title=f'Tarefa {i}', description='Descrição da tarefa', due_date=now)
+             for i in range(size)],
+            batch_size=1000,
+        )
+        # Serializa uma vez: só a codificação entra na medição
+        data = TaskSerializer(Task.objects.filter(user=user).select_related('user'), many=True).data
+
+        baseline = None
+        for name, renderer in candidates:
+            seconds = measure(lambda: renderer.render(data, renderer.media_type), repeat)
+            payload = len(renderer.render(data, renderer.media_type))
+            baseline = baseline or (seconds, payload)
+            self.stdout.write(
+                f'{size:>7} tarefas  {name:<20} {seconds * 1000:>9.2f} ms  {payload:>11,} bytes'
+                f'  ({baseline[0] / seconds:.1f}x mais rápido, {payload / baseline[1]:.0%} do tamanho)'
+            )
@@ -0,0 +1,48 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from accounts.management.bench import Rollback, measure
+from accounts.models import Task
+from accounts.serializers import FastTaskSerializer, TaskSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compara TaskSerializer e FastTaskSerializer em linhas/segundo (dados descartados ao final)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000])
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                for size in options['sizes']:
+                    self.run(size, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, size, repeat):
+        user = User.objects.create(username=f'bench-serializers-{size}-{time.time_ns()}')
+        Task.objects.bulk_create(
+            [Task(user=user, title=f'Tarefa {i}', description='Descrição da tarefa') for i in range(size)],
+            batch_size=1000,
+        )
+        tasks = Task.objects.filter(user=user)
+        renderer = JSONRenderer()
+
+        def drf():
+            return renderer.render(TaskSerializer(tasks.select_related('user'), many=True).data)
+
+        def fast():
+            return renderer.render(FastTaskSerializer(FastTaskSerializer.values(tasks)).data)
+
+        results = {name: measure(func, repeat) for name, func in (('TaskSerializer', drf), ('FastTaskSerializer', fast))}
+        for name, seconds in results.items():
+            self.stdout.write(f'{size:>7} tarefas  {name:<20} {size / seconds:>12,.0f} linhas/s  ({seconds * 1000:.1f} ms)')
+        speedup = results['TaskSerializer'] / results['FastTaskSerializer']
+        self.stdout.write(self.style.SUCCESS(f'{size:>7} tarefas  ganho de {speedup:.1f}x'))
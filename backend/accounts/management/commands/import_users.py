@@ -0,0 +1,168 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+
+def init_worker():
+    """Garante o Django configurado nos processos filhos (necessário com spawn)"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'login_projeto.settings')
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa usuários de um arquivo CSV ou JSONL (username, email, password), '
+        'gerando os hashes de senha em paralelo e inserindo em lotes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Arquivo .csv ou .jsonl')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Padrão: pela extensão do arquivo')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'Arquivo não encontrado: {path}')
+        file_format = options['format'] or ('jsonl' if path.suffix in ('.jsonl', '.ndjson') else 'csv')
+
+        start = time.perf_counter()
+        rows, failures = self.read_rows(path, file_format)
+        rows = self.dedupe(rows, failures)
+
+        hash_start = time.perf_counter()
+        passwords = self.hash_passwords([row['password'] for _, row in rows], options['workers'])
+        hash_seconds = time.perf_counter() - hash_start
+
+        users = [
+            (line, User(
+                username=row['username'],
+                email=User.objects.normalize_email(row.get('email') or ''),
+                password=password,
+            ))
+            for (line, row), password in zip(rows, passwords)
+        ]
+        created = self.insert(users, options['batch_size'], failures)
+        elapsed = time.perf_counter() - start
+
+        for line, message in sorted(failures):
+            self.stderr.write(f'linha {line}: {message}')
+        rate = created / elapsed if elapsed else 0
+        hash_rate = len(passwords) / hash_seconds if hash_seconds else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'{created} usuários criados, {len(failures)} falhas em {elapsed:.2f}s '
+            f'({rate:.0f} usuários/s; hashing {hash_rate:.0f} senhas/s com {options["workers"]} processos)'
+        ))
+
+    def read_rows(self, path, file_format):
+        """Lê o arquivo e separa as linhas válidas das falhas, com o número da linha"""
+        rows, failures = [], []
+        with path.open(newline='', encoding='utf-8') as handle:
+            if file_format == 'csv':
+                # Linha 1 é o cabeçalho
+                records = enumerate(csv.DictReader(handle), start=2)
+            else:
+                records = enumerate(handle, start=1)
+            for line, record in records:
+                if file_format == 'jsonl':
+                    if not record.strip():
+                        continue
+                    try:
+                        record = json.loads(record)
+                    except ValueError:
+                        failures.append((line, 'JSON inválido'))
+                        continue
+                    if not isinstance(record, dict):
+                        failures.append((line, 'JSON inválido'))
+                        continue
+                error = self.validate(record)
+                if error:
+                    failures.append((line, error))
+                else:
+                    rows.append((line, record))
+        return rows, failures
+
+    def validate(self, record):
+        username, password, email = record.get('username'), record.get('password'), record.get('email')
+        # Os valores do JSONL podem ser de qualquer tipo; falhariam só nos processos de hash
+        if not all(isinstance(value, str) for value in (username, password, email) if value is not None):
+            return 'username, email e password precisam ser textos'
+        if not username or not password:
+            return 'username e password são obrigatórios'
+        if len(username) > User._meta.get_field('username').max_length:
+            return 'username muito longo'
+        try:
+            User.username_validator(username)
+        except ValidationError as e:
+            return e.messages[0]
+        if email:
+            try:
+                validate_email(email)
+            except ValidationError:
+                return f'e-mail inválido: {email}'
+        return None
+
+    def dedupe(self, rows, failures):
+        """Remove usernames repetidos no arquivo e os que já existem (uma consulta)"""
+        usernames = {row['username'] for _, row in rows}
+        existing = set(
+            User.objects.filter(username__in=usernames).values_list('username', flat=True)
+        )
+        unique, seen = [], set()
+        for line, row in rows:
+            username = row['username']
+            if username in existing:
+                failures.append((line, f'usuário "{username}" já existe'))
+            elif username in seen:
+                failures.append((line, f'usuário "{username}" repetido no arquivo'))
+            else:
+                seen.add(username)
+                unique.append((line, row))
+        return unique
+
+    def hash_passwords(self, passwords, workers):
+        """Gera os hashes em paralelo; o PBKDF2 domina o custo da importação"""
+        if workers <= 1 or len(passwords) < 2:
+            return [make_password(password) for password in passwords]
+        chunksize = max(1, len(passwords) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+            return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+    def insert(self, users, batch_size, failures):
+        created = 0
+        for index in range(0, len(users), batch_size):
+            batch = users[index:index + batch_size]
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create([user for _, user in batch])
+            except IntegrityError:
+                # Usuário criado por outro processo depois da verificação de duplicados:
+                # refaz o lote linha a linha para só as conflitantes falharem
+                created += self.insert_rows(batch, failures)
+            else:
+                created += len(batch)
+        return created
+
+    def insert_rows(self, batch, failures):
+        created = 0
+        for line, user in batch:
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create([user])
+            except IntegrityError as e:
+                failures.append((line, f'usuário "{user.username}" rejeitado: {e}'))
+            else:
+                created += 1
+        return created
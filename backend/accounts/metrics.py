@@ -0,0 +1,237 @@
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from hmac import compare_digest
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.decorators import sync_and_async_middleware
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# nome: (tipo, descrição, buckets dos histogramas)
+METRICS = {
+    'http_requests_total': ('counter', 'Requisições por rota, método e status', None),
+    'http_request_duration_seconds': ('histogram', 'Latência das requisições', LATENCY_BUCKETS),
+    'http_response_size_bytes': ('histogram', 'Tamanho do corpo das respostas (sem streaming)', SIZE_BUCKETS),
+    'http_auth_failures_total': ('counter', 'Respostas 401/403', None),
+    'db_queries_per_request': ('histogram', 'Consultas SQL por requisição', QUERY_BUCKETS),
+    'db_query_duration_seconds_total': ('counter', 'Tempo total gasto em consultas SQL', None),
+    'rate_limit_requests_total': ('counter', 'Requisições verificadas pelo limite de taxa, por rota e escopo', None),
+    'rate_limit_rejections_total': ('counter', 'Requisições recusadas (429) pelo limite de taxa', None),
+    'task_response_cache_total': ('counter', 'Consultas ao cache de listagens de tarefas, por resultado', None),
+}
+
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+class MetricsRegistry:
+    """
+    Agregação das métricas do processo sem lock no caminho da requisição.
+
+    Cada thread soma em seu próprio dicionário, com um único escritor; a coleta
+    copia os dicionários de todas as threads (a cópia é atômica com a GIL) e soma.
+    O lock só é usado quando uma thread grava pela primeira vez e na gravação do
+    arquivo do processo.
+
+    Com METRICS_MULTIPROC_DIR, cada processo grava seu total num arquivo JSON a
+    cada METRICS_FLUSH_INTERVAL segundos e a coleta soma os arquivos de todos os
+    workers, então qualquer worker responde /metrics com o total do servidor.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._stores = []
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def _store(self):
+        try:
+            return self._local.store
+        except AttributeError:
+            store = self._local.store = {}
+            with self._lock:
+                self._stores.append(store)
+            return store
+
+    def inc(self, name, labels, value=1):
+        store = self._store()
+        key = (name, labels, '')
+        store[key] = store.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        store = self._store()
+        bucket = (name, labels, bisect_left(METRICS[name][2], value))
+        store[bucket] = store.get(bucket, 0) + 1
+        store[(name, labels, 'sum')] = store.get((name, labels, 'sum'), 0) + value
+        store[(name, labels, 'count')] = store.get((name, labels, 'count'), 0) + 1
+
+    def snapshot(self):
+        """Soma as métricas de todas as threads deste processo"""
+        merged = {}
+        for store in list(self._stores):
+            for key, value in store.copy().items():
+                merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def reset(self):
+        with self._lock:
+            for store in self._stores:
+                store.clear()
+
+    def _path(self, directory, pid=None):
+        return os.path.join(directory, f'{pid or os.getpid()}.json')
+
+    def maybe_flush(self):
+        directory = settings.METRICS_MULTIPROC_DIR
+        now = time.monotonic()
+        if not directory or now - self._last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        # Só uma thread grava; as demais seguem sem esperar
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._last_flush = now
+            self.flush(directory)
+        finally:
+            self._lock.release()
+
+    def flush(self, directory):
+        path = self._path(directory)
+        entries = [[name, labels, part, value] for (name, labels, part), value in self.snapshot().items()]
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as target:
+            json.dump(entries, target)
+        os.replace(f'{path}.tmp', path)
+
+    def collect(self):
+        """Métricas deste processo somadas às gravadas pelos outros workers"""
+        merged = self.snapshot()
+        directory = settings.METRICS_MULTIPROC_DIR
+        if not directory:
+            return merged
+        own = self._path(directory)
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            if path == own:
+                continue
+            try:
+                with open(path, encoding='utf-8') as source:
+                    entries = json.load(source)
+            except (OSError, ValueError):
+                continue
+            for name, labels, part, value in entries:
+                key = (name, tuple(tuple(pair) for pair in labels), part)
+                merged[key] = merged.get(key, 0) + value
+        return merged
+
+
+registry = MetricsRegistry()
+
+
+def escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(labels):
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels) + '}'
+
+
+def render_metrics(values):
+    """Formata as métricas no formato de texto do Prometheus"""
+    series = {}
+    for (name, labels, part), value in values.items():
+        series.setdefault(name, {}).setdefault(labels, {})[part] = value
+
+    lines = []
+    for name, (kind, description, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, parts in sorted(series.get(name, {}).items()):
+            if kind == 'counter':
+                lines.append(f'{name}{format_labels(labels)} {parts[""]}')
+                continue
+            cumulative = 0
+            for index, bound in enumerate(buckets):
+                cumulative += parts.get(index, 0)
+                lines.append(f'{name}_bucket{format_labels(labels + (("le", str(bound)),))} {cumulative}')
+            lines.append(f'{name}_bucket{format_labels(labels + (("le", "+Inf"),))} {parts.get("count", 0)}')
+            lines.append(f'{name}_sum{format_labels(labels)} {parts.get("sum", 0)}')
+            lines.append(f'{name}_count{format_labels(labels)} {parts.get("count", 0)}')
+    return '\n'.join(lines) + '\n'
+
+
+# [consultas, segundos] da requisição atual; o contexto acompanha sync_to_async,
+# então as consultas das views async também são contadas
+request_queries = ContextVar('request_queries', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """execute_wrapper instalado em toda conexão (ver signals.py)"""
+    counter = request_queries.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        counter[0] += 1
+        counter[1] += time.perf_counter() - start
+
+
+def record_request(request, response, elapsed, counter):
+    match = getattr(request, 'resolver_match', None)
+    route = '/' + match.route if match else 'unmatched'
+    method = request.method if request.method in METHODS else 'other'
+    labels = (('route', route), ('method', method))
+
+    registry.inc('http_requests_total', labels + (('status', str(response.status_code)),))
+    registry.observe('http_request_duration_seconds', labels, elapsed)
+    registry.observe('db_queries_per_request', labels, counter[0])
+    registry.inc('db_query_duration_seconds_total', labels, counter[1])
+    if not response.streaming:
+        registry.observe('http_response_size_bytes', labels, len(response.content))
+    if response.status_code in (401, 403):
+        registry.inc('http_auth_failures_total', labels)
+    registry.maybe_flush()
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """Registra latência, consultas SQL, tamanho da resposta e falhas de autenticação por rota"""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            counter = [0, 0.0]
+            token = request_queries.set(counter)
+            start = time.perf_counter()
+            try:
+                response = await get_response(request)
+            finally:
+                request_queries.reset(token)
+            record_request(request, response, time.perf_counter() - start, counter)
+            return response
+    else:
+        def middleware(request):
+            counter = [0, 0.0]
+            token = request_queries.set(counter)
+            start = time.perf_counter()
+            try:
+                response = get_response(request)
+            finally:
+                request_queries.reset(token)
+            record_request(request, response, time.perf_counter() - start, counter)
+            return response
+    return middleware
+
+
+def metrics_view(request):
+    """Expõe as métricas no formato do Prometheus; exige METRICS_TOKEN se configurado"""
+    token = settings.METRICS_TOKEN
+    if token and not compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401, headers={'WWW-Authenticate': 'Bearer realm="metrics"'})
+    return HttpResponse(render_metrics(registry.collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
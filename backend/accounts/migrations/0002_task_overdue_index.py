@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'in_progress'])), fields=['user', 'due_date'], name='tasks_user_open_due_idx'),
+        ),
+    ]
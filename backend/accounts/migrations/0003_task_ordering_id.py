@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:46
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_task_overdue_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': 'Tarefa', 'verbose_name_plural': 'Tarefas'},
+        ),
+    ]
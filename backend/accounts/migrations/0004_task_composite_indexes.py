@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_task_ordering_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='tasks_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'status', '-created_at', '-id'], name='tasks_user_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'priority', '-created_at', '-id'], name='tasks_user_prio_created_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# O lookup istartswith do PostgreSQL gera `UPPER("coluna"::text) LIKE UPPER('termo%')`;
+# com text_pattern_ops o índice atende o LIKE por prefixo em qualquer collation.
+INDEXES = {
+    'auth_user_username_upper_like': 'UPPER("username"::text) text_pattern_ops',
+    'auth_user_email_upper_like': 'UPPER("email"::text) text_pattern_ops',
+}
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, expression in INDEXES.items():
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "auth_user" ({expression})')
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_task_composite_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# Coluna gerada: o PostgreSQL recalcula o tsvector em todo INSERT/UPDATE, então
+# não há trigger nem código na aplicação para mantê-la atualizada.
+# O título tem peso A e a descrição peso B no ranking.
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('portuguese'::regconfig, coalesce(\"title\", '')), 'A') || "
+    "setweight(to_tsvector('portuguese'::regconfig, coalesce(\"description\", '')), 'B')"
+)
+
+
+def add_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'ALTER TABLE "tasks" ADD COLUMN IF NOT EXISTS "search_vector" tsvector '
+        f'GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS "tasks_search_vector_idx" ON "tasks" USING GIN ("search_vector")'
+    )
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS "tasks_search_vector_idx"')
+    schema_editor.execute('ALTER TABLE "tasks" DROP COLUMN IF EXISTS "search_vector"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_directory_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vector, drop_search_vector),
+    ]
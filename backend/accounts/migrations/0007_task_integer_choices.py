@@ -0,0 +1,65 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:05
+
+import accounts.fields
+from django.conf import settings
+from django.db import migrations, models
+
+# Posição (1-based) de cada código nas choices: é o valor gravado por CodeChoiceField
+CODES = {
+    'priority': ['low', 'medium', 'high', 'urgent'],
+    'status': ['pending', 'in_progress', 'completed', 'cancelled'],
+}
+
+
+def codes_to_numbers(apps, schema_editor):
+    # Ainda em varchar: grava o número como texto, que a troca de tipo converte
+    Task = apps.get_model('accounts', 'Task')
+    for field, codes in CODES.items():
+        for number, code in enumerate(codes, start=1):
+            Task.objects.filter(**{field: code}).update(**{field: str(number)})
+
+
+def numbers_to_codes(apps, schema_editor):
+    Task = apps.get_model('accounts', 'Task')
+    for field, codes in CODES.items():
+        for number, code in enumerate(codes, start=1):
+            Task.objects.filter(**{field: str(number)}).update(**{field: code})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_task_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # O predicado do índice parcial compara status com texto; é recriado no fim
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_user_open_due_idx',
+        ),
+        migrations.RunPython(codes_to_numbers, numbers_to_codes),
+        migrations.AlterField(
+            model_name='task',
+            name='priority',
+            field=accounts.fields.CodeChoiceField(choices=[('low', 'Baixa'), ('medium', 'Média'), ('high', 'Alta'), ('urgent', 'Urgente')], default='medium', verbose_name='Prioridade'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='status',
+            field=accounts.fields.CodeChoiceField(choices=[('pending', 'Pendente'), ('in_progress', 'Em Progresso'), ('completed', 'Concluída'), ('cancelled', 'Cancelada')], default='pending', verbose_name='Status'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'in_progress'])), fields=['user', 'due_date'], name='tasks_user_open_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', '-priority', 'due_date', 'id'], name='tasks_user_prio_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'due_date', 'id'], name='tasks_user_due_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_task_integer_choices'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField(verbose_name='Tarefa')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='Removida em')),
+            ],
+            options={
+                'verbose_name': 'Tarefa removida',
+                'verbose_name_plural': 'Tarefas removidas',
+                'db_table': 'task_tombstones',
+                'ordering': ['deleted_at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='tasks_user_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='tasktombstone',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_tombstones', to=settings.AUTH_USER_MODEL, verbose_name='Usuário'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktombstone',
+            index=models.Index(fields=['user', 'deleted_at', 'id'], name='tombstones_user_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:26
+
+import accounts.fields
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_task_sync'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('title', models.CharField(max_length=200, verbose_name='Título')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='Descrição')),
+                ('priority', accounts.fields.CodeChoiceField(choices=[('low', 'Baixa'), ('medium', 'Média'), ('high', 'Alta'), ('urgent', 'Urgente')], default='medium', verbose_name='Prioridade')),
+                ('status', accounts.fields.CodeChoiceField(choices=[('pending', 'Pendente'), ('in_progress', 'Em Progresso'), ('completed', 'Concluída'), ('cancelled', 'Cancelada')], default='pending', verbose_name='Status')),
+                ('due_date', models.DateTimeField(blank=True, null=True, verbose_name='Data de Vencimento')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Concluído em')),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(verbose_name='Atualizado em')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Arquivada em')),
+            ],
+            options={
+                'verbose_name': 'Tarefa arquivada',
+                'verbose_name_plural': 'Tarefas arquivadas',
+                'db_table': 'tasks_archive',
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status__in', ['completed', 'cancelled'])), fields=['updated_at', 'id'], name='tasks_closed_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to=settings.AUTH_USER_MODEL, verbose_name='Usuário'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='archive_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['user', 'status', '-created_at', '-id'], name='archive_user_status_idx'),
+        ),
+    ]
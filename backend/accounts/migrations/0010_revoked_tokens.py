@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_task_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=255, unique=True, verbose_name='JTI')),
+                ('expires_at', models.DateTimeField(verbose_name='Expira em')),
+                ('revoked_at', models.DateTimeField(auto_now_add=True, verbose_name='Revogado em')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='revoked_tokens', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Token revogado',
+                'verbose_name_plural': 'Tokens revogados',
+                'db_table': 'revoked_tokens',
+                'ordering': ['-revoked_at'],
+                'indexes': [models.Index(fields=['revoked_at'], name='revoked_tokens_revoked_idx'), models.Index(fields=['expires_at'], name='revoked_tokens_expires_idx')],
+            },
+        ),
+    ]
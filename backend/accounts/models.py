@@ -1,11 +1,185 @@
-from django.db import models
+from functools import reduce
+from operator import add, and_
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connections, models, transaction
+from django.db.models import BooleanField, Case, Count, FloatField, Min, Q, Value, When
+from django.db.models.expressions import Expression
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from .fields import CodeChoiceField
+
 # Create your models here.
 
-class Task(models.Model):
-    """Modelo para representar uma tarefa do usuário"""
+# Status em que uma tarefa ainda pode ficar atrasada
+OPEN_STATUSES = ['pending', 'in_progress']
+
+# Status das tarefas encerradas, que podem ir para o arquivo (ver archive.py)
+CLOSED_STATUSES = ['completed', 'cancelled']
+
+# Configuração de texto da coluna tasks.search_vector (ver migração 0006)
+SEARCH_CONFIG = 'portuguese'
+
+
+def overdue_condition(now=None):
+    """Condição SQL para tarefas em aberto com vencimento anterior a `now`"""
+    return Q(status__in=OPEN_STATUSES, due_date__lt=now or timezone.now())
+
+
+class SearchVectorColumn(Expression):
+    """
+    Coluna gerada `search_vector` da tabela de tarefas (não é campo do modelo).
+
+    Guarda o alias da tabela como uma coluna comum e o acompanha quando a consulta
+    vira subconsulta (`pk__in`, em que `tasks` passa a ser U0); um RawSQL com o
+    nome da tabela apontaria para a consulta externa e ficaria correlacionado.
+    """
+
+    def __init__(self, alias=None):
+        super().__init__(output_field=SearchVectorField())
+        self.alias = alias
+
+    def resolve_expression(self, query=None, allow_joins=True, reuse=None, summarize=False, for_save=False):
+        resolved = super().resolve_expression(query, allow_joins, reuse, summarize, for_save)
+        if resolved.alias is None:
+            resolved.alias = query.get_initial_alias()
+        return resolved
+
+    def relabeled_clone(self, change_map):
+        clone = self.copy()
+        clone.alias = change_map.get(self.alias, self.alias)
+        return clone
+
+    def as_sql(self, compiler, connection):
+        return f'{compiler.quote_name_unless_alias(self.alias)}.{connection.ops.quote_name("search_vector")}', []
+
+
+class TaskQuerySet(models.QuerySet):
+    """QuerySet com consultas otimizadas para tarefas"""
+
+    def with_code(self, name, value):
+        """Filtra pelo código de um campo de choices; código desconhecido não encontra nada"""
+        if value not in self.model._meta.get_field(name).codes:
+            return self.none()
+        return self.filter(**{name: value})
+
+    def delete_with_tombstones(self):
+        """Remove as tarefas registrando um TaskTombstone para cada uma, na mesma transação"""
+        with transaction.atomic(savepoint=False):
+            tasks = list(self.values_list('pk', 'user_id'))
+            TaskTombstone.objects.bulk_create([
+                TaskTombstone(task_id=pk, user_id=user_id) for pk, user_id in tasks
+            ])
+            return self.model.objects.filter(pk__in=[pk for pk, _ in tasks]).delete()
+
+    def overdue(self):
+        """Filtra as tarefas atrasadas diretamente no banco"""
+        return self.filter(overdue_condition())
+
+    def with_overdue(self):
+        """Anota cada tarefa com `overdue`, calculado no banco"""
+        return self.annotate(overdue=Case(
+            When(overdue_condition(), then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        ))
+
+    def search(self, term):
+        """
+        Busca textual em título e descrição, anotando `rank` e ordenando por relevância.
+
+        No PostgreSQL usa a coluna gerada `search_vector` (tsvector com peso maior
+        para o título) e seu índice GIN. Nos demais bancos, cada palavra do termo
+        precisa aparecer no título ou na descrição, e o rank conta as ocorrências.
+        """
+        queryset, condition, rank = self._search_parts(term)
+        if rank is None:
+            return self.none()
+        queryset = queryset.filter(condition).annotate(rank=rank)
+        return queryset.order_by('-rank', '-created_at', '-id')
+
+    def matching(self, term, alternative=None):
+        """
+        Filtra as tarefas que casam com a busca de search(), sem rank nem ordenação.
+
+        `alternative` (Q) aceita também as linhas que a satisfazem, na mesma
+        cláusula WHERE, sem subconsulta. Com colunas só de tasks, o PostgreSQL
+        combina o índice GIN e o da outra condição (BitmapOr); uma coluna de
+        tabela do join no OR leva a uma varredura completa.
+        """
+        queryset, condition, _ = self._search_parts(term)
+        if alternative is not None:
+            condition |= alternative
+        return queryset.filter(condition)
+
+    def _search_parts(self, term):
+        """(queryset, condição da busca, expressão do rank ou None se o termo é vazio)"""
+        if connections[self.db].vendor == 'postgresql':
+            query = SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+            document = SearchVectorColumn()
+            return self.alias(document=document), Q(document=query), SearchRank(document, query)
+        words = term.split()
+        if not words:
+            return self, Q(pk__in=[]), None
+        condition = reduce(and_, [Q(title__icontains=word) | Q(description__icontains=word) for word in words])
+        rank = reduce(add, [
+            Case(When(title__icontains=word, then=Value(1.0)), default=Value(0.0), output_field=FloatField())
+            + Case(When(description__icontains=word, then=Value(0.4)), default=Value(0.0), output_field=FloatField())
+            for word in words
+        ])
+        return self, condition, rank
+
+    def stats(self):
+        """
+        Calcula as estatísticas das tarefas em uma única consulta agregada.
+
+        Além dos contadores, retorna em 'next_due' o próximo vencimento de uma
+        tarefa em aberto, momento em que o contador 'overdue' deixa de valer.
+        """
+        return self._format_stats(self.aggregate(**self._stats_aggregates()))
+
+    async def astats(self):
+        """Versão assíncrona de stats()"""
+        return self._format_stats(await self.aaggregate(**self._stats_aggregates()))
+
+    def _stats_aggregates(self):
+        now = timezone.now()
+        open_tasks = Q(status__in=OPEN_STATUSES)
+        return {
+            'total': Count('id'),
+            'completed': Count('id', filter=Q(status='completed')),
+            'pending': Count('id', filter=Q(status='pending')),
+            'in_progress': Count('id', filter=Q(status='in_progress')),
+            'cancelled': Count('id', filter=Q(status='cancelled')),
+            'overdue': Count('id', filter=overdue_condition(now)),
+            'low': Count('id', filter=Q(priority='low')),
+            'medium': Count('id', filter=Q(priority='medium')),
+            'high': Count('id', filter=Q(priority='high')),
+            'urgent': Count('id', filter=Q(priority='urgent')),
+            'next_due': Min('due_date', filter=open_tasks & Q(due_date__gte=now)),
+        }
+
+    def _format_stats(self, result):
+        return {
+            'total': result['total'],
+            'completed': result['completed'],
+            'pending': result['pending'],
+            'in_progress': result['in_progress'],
+            'cancelled': result['cancelled'],
+            'overdue': result['overdue'],
+            'by_priority': {
+                'low': result['low'],
+                'medium': result['medium'],
+                'high': result['high'],
+                'urgent': result['urgent'],
+            },
+            'next_due': result['next_due'],
+        }
+
+
+class BaseTask(models.Model):
+    """Campos comuns às tarefas ativas (Task) e arquivadas (ArchivedTask)"""
     
     PRIORITY_CHOICES = [
         ('low', 'Baixa'),
@@ -23,14 +197,13 @@ class Task(models.Model):
     
     title = models.CharField(max_length=200, verbose_name='Título')
     description = models.TextField(blank=True, null=True, verbose_name='Descrição')
-    priority = models.CharField(
-        max_length=10, 
+    # Armazenados como inteiro pequeno, na ordem das choices (ver CodeChoiceField)
+    priority = CodeChoiceField(
         choices=PRIORITY_CHOICES, 
         default='medium',
         verbose_name='Prioridade'
     )
-    status = models.CharField(
-        max_length=15, 
+    status = CodeChoiceField(
         choices=STATUS_CHOICES, 
         default='pending',
         verbose_name='Status'
@@ -39,6 +212,16 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
     completed_at = models.DateTimeField(blank=True, null=True, verbose_name='Concluído em')
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.title} - {self.get_status_display()}"
+
+
+class Task(BaseTask):
+    """Modelo para representar uma tarefa do usuário"""
     
     # Relacionamento com o usuário
     user = models.ForeignKey(
@@ -48,14 +231,37 @@ class Task(models.Model):
         verbose_name='Usuário'
     )
     
+    objects = TaskQuerySet.as_manager()
+    
     class Meta:
         db_table = 'tasks'
         verbose_name = 'Tarefa'
         verbose_name_plural = 'Tarefas'
-        ordering = ['-created_at']
-    
-    def __str__(self):
-        return f"{self.title} - {self.get_status_display()}"
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Listagens por usuário, filtradas por status/prioridade, na ordem padrão
+            models.Index(fields=['user', '-created_at', '-id'], name='tasks_user_created_idx'),
+            models.Index(fields=['user', 'status', '-created_at', '-id'], name='tasks_user_status_created_idx'),
+            models.Index(fields=['user', 'priority', '-created_at', '-id'], name='tasks_user_prio_created_idx'),
+            # Atende Task.objects.overdue() e o contador de atrasadas
+            models.Index(
+                fields=['user', 'due_date'],
+                condition=Q(status__in=OPEN_STATUSES),
+                name='tasks_user_open_due_idx',
+            ),
+            # Ordenação pelo parâmetro `ordering` (mais urgente e vencimento mais próximo
+            # primeiro); o PostgreSQL também percorre os índices ao contrário
+            models.Index(fields=['user', '-priority', 'due_date', 'id'], name='tasks_user_prio_due_idx'),
+            models.Index(fields=['user', 'due_date', 'id'], name='tasks_user_due_idx'),
+            # Sincronização incremental: tarefas alteradas depois do cursor
+            models.Index(fields=['user', 'updated_at', 'id'], name='tasks_user_updated_idx'),
+            # Arquivamento: tarefas encerradas, das mais antigas para as mais novas
+            models.Index(
+                fields=['updated_at', 'id'],
+                condition=Q(status__in=CLOSED_STATUSES),
+                name='tasks_closed_updated_idx',
+            ),
+        ]
     
     def mark_as_completed(self):
         """Marca a tarefa como concluída"""
@@ -73,3 +279,91 @@ class Task(models.Model):
     def is_completed(self):
         """Propriedade para verificar se a tarefa está concluída"""
         return self.status == 'completed'
+
+
+class ArchivedTask(BaseTask):
+    """
+    Tarefa encerrada há mais de TASK_ARCHIVE_AFTER_DAYS dias, fora da tabela `tasks`.
+
+    Mantém o id original, então os clientes continuam reconhecendo a tarefa; só é
+    lida quando a requisição pede `include_archived`.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    # Copiados da tarefa original, sem os valores automáticos
+    created_at = models.DateTimeField(verbose_name='Criado em')
+    updated_at = models.DateTimeField(verbose_name='Atualizado em')
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name='Arquivada em')
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_tasks',
+        verbose_name='Usuário'
+    )
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'tasks_archive'
+        verbose_name = 'Tarefa arquivada'
+        verbose_name_plural = 'Tarefas arquivadas'
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='archive_user_created_idx'),
+            models.Index(fields=['user', 'status', '-created_at', '-id'], name='archive_user_status_idx'),
+        ]
+
+
+class TaskTombstone(models.Model):
+    """Registro de uma tarefa removida, usado pela sincronização incremental dos clientes"""
+
+    task_id = models.BigIntegerField(verbose_name='Tarefa')
+    deleted_at = models.DateTimeField(auto_now_add=True, verbose_name='Removida em')
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='task_tombstones',
+        verbose_name='Usuário'
+    )
+
+    class Meta:
+        db_table = 'task_tombstones'
+        verbose_name = 'Tarefa removida'
+        verbose_name_plural = 'Tarefas removidas'
+        ordering = ['deleted_at', 'id']
+        indexes = [
+            models.Index(fields=['user', 'deleted_at', 'id'], name='tombstones_user_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"Tarefa {self.task_id} removida em {self.deleted_at}"
+
+
+class RevokedToken(models.Model):
+    """JWT revogado (logout ou vazamento), pelo `jti`, até a expiração do token"""
+
+    jti = models.CharField(max_length=255, unique=True, verbose_name='JTI')
+    expires_at = models.DateTimeField(verbose_name='Expira em')
+    revoked_at = models.DateTimeField(auto_now_add=True, verbose_name='Revogado em')
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='revoked_tokens',
+        verbose_name='Usuário'
+    )
+
+    class Meta:
+        db_table = 'revoked_tokens'
+        verbose_name = 'Token revogado'
+        verbose_name_plural = 'Tokens revogados'
+        ordering = ['-revoked_at']
+        indexes = [
+            # Sincronização incremental dos workers e limpeza dos expirados
+            models.Index(fields=['revoked_at'], name='revoked_tokens_revoked_idx'),
+            models.Index(fields=['expires_at'], name='revoked_tokens_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.jti} (revogado em {self.revoked_at})"
@@ -0,0 +1,258 @@
+import base64
+import json
+from functools import cmp_to_key
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from django.db.models.fields.tuple_lookups import Tuple, TupleGreaterThan, TupleLessThan
+from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por cursor (keyset) sobre uma tupla de campos de ordenação.
+
+    Cada página é buscada a partir da posição do cursor (ver after_position), sem OFFSET,
+    então o custo não cresce com a profundidade da página e inserções concorrentes
+    não causam itens repetidos ou pulados. O último campo de `ordering` precisa ser
+    único (normalmente o `id`) para desempatar.
+
+    Cada campo tem sua própria direção, e campos que aceitam NULL são ordenados
+    com os nulos como maiores valores (no fim em ordem crescente, no início em
+    decrescente), como o padrão do PostgreSQL, em qualquer banco.
+    """
+
+    ordering = None
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = None
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+    def get_page_size(self, request):
+        max_page_size = self.max_page_size or settings.PAGINATION_MAX_PAGE_SIZE
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.build_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Versão assíncrona de paginate_queryset, para views async"""
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.build_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Aplica ordenação, posição do cursor e limite, sem executar a consulta"""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.fields = self.get_ordering(request, queryset, view)
+        self.model = queryset.model
+        self.position, self.reverse = self.decode_cursor(request)
+
+        self.order = order = [(name.lstrip('-'), name.startswith('-') != self.reverse) for name in self.fields]
+        queryset = queryset.order_by(*[self.order_expression(name, desc) for name, desc in order])
+        if self.position is not None:
+            queryset = queryset.filter(self.after_position(order, self.position))
+        return queryset[:self.page_size + 1]
+
+    def paginate_querysets(self, querysets, request, view=None):
+        """
+        Pagina várias consultas com os mesmos campos (ex.: tarefas ativas e
+        arquivadas) como se fossem uma só: cada uma traz sua página a partir do
+        mesmo cursor e as linhas são intercaladas na ordem da paginação.
+        """
+        rows = []
+        for queryset in querysets:
+            rows.extend(self.get_page_queryset(queryset, request, view))
+        rows.sort(key=cmp_to_key(self.compare_rows))
+        return self.build_page(rows[:self.page_size + 1])
+
+    def compare_rows(self, first, second):
+        """Compara duas linhas na ordem da paginação, com os nulos como maiores valores"""
+        for (name, desc), a, b in zip(self.order, self.get_position(first), self.get_position(second)):
+            # Compara o valor do banco (ex.: o inteiro de CodeChoiceField, não o código)
+            field = self.model._meta.get_field(name)
+            a, b = field.get_prep_value(a), field.get_prep_value(b)
+            if a == b:
+                continue
+            greater = a is None or (b is not None and a > b)
+            return -1 if greater == desc else 1
+        return 0
+
+    def is_nullable(self, name):
+        return self.model._meta.get_field(name).null
+
+    def order_expression(self, name, desc):
+        if not self.is_nullable(name):
+            return F(name).desc() if desc else F(name).asc()
+        return F(name).desc(nulls_first=True) if desc else F(name).asc(nulls_last=True)
+
+    def build_page(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = self.position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+
+        self.first_position = self.get_position(results[0]) if results else None
+        self.last_position = self.get_position(results[-1]) if results else None
+        return results
+
+    def after_position(self, order, position):
+        """
+        Monta a condição que seleciona as linhas depois de `position` na ordem dada.
+
+        Com todos os campos na mesma direção e sem nulos, é uma comparação de
+        tuplas, `(created_at, id) < (x, y)`; nos demais casos (e nos bancos sem
+        comparação de tuplas) é expandida em OR. Em ambos vai junto um limite
+        redundante no primeiro campo (`created_at <= x`), que dá ao índice composto
+        o ponto de partida da busca por faixa que o OR sozinho não dá.
+        """
+        (first, first_desc), first_value = order[0], position[0]
+        bound = self.leading_bound(first, first_desc, first_value)
+        names = [name for name, _ in order]
+        directions = {desc for _, desc in order}
+        if len(directions) == 1 and not any(self.is_nullable(name) for name in names):
+            lookup = TupleLessThan if first_desc else TupleGreaterThan
+            return bound & Q(lookup(Tuple(*[F(name) for name in names]), tuple(position)))
+
+        condition = Q()
+        equal = Q()
+        for (name, desc), value in zip(order, position):
+            condition |= equal & self.after_value(name, desc, value)
+            equal &= Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+        return bound & condition
+
+    def leading_bound(self, name, desc, value):
+        """Condição implícita em after_position para o primeiro campo: ele não volta atrás"""
+        if value is None:
+            # Em decrescente os nulos vêm primeiro, então não há limite
+            return Q() if desc else Q(**{f'{name}__isnull': True})
+        bound = Q(**{f'{name}__lte' if desc else f'{name}__gte': value})
+        if not desc and self.is_nullable(name):
+            bound |= Q(**{f'{name}__isnull': True})
+        return bound
+
+    def after_value(self, name, desc, value):
+        """Condição para um campo vir depois de `value`, com os nulos como maiores valores"""
+        if value is None:
+            # Depois de um nulo: em ordem crescente, nada; em decrescente, os não nulos
+            return Q(**{f'{name}__isnull': False}) if desc else Q(pk__in=[])
+        after = Q(**{f'{name}__lt' if desc else f'{name}__gt': value})
+        if not desc and self.is_nullable(name):
+            after |= Q(**{f'{name}__isnull': True})
+        return after
+
+    def get_position(self, row):
+        names = [name.lstrip('-') for name in self.fields]
+        if isinstance(row, dict):
+            return [row[name] for name in names]
+        return [getattr(row, name) for name in names]
+
+    def encode_cursor(self, position, reverse=False):
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in position]
+        payload = json.dumps({'p': values, 'r': reverse}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            data = json.loads(payload)
+            values = data['p']
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [
+                self.model._meta.get_field(name.lstrip('-')).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+            return position, bool(data.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or self.last_position is None:
+            return None
+        return self.encode_cursor(self.last_position)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_position is None:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.first_position, reverse=True)
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class TaskCursorPagination(KeysetPagination):
+    """
+    Paginação das listas de tarefas, na mesma ordem de Task.Meta.ordering.
+
+    O parâmetro `ordering` troca a ordem por campos de `ordering_fields`, separados
+    por vírgula e com `-` para decrescente (ex.: `-priority,due_date`). O `id` entra
+    no fim para desempatar, na direção do último campo.
+    """
+
+    ordering = ('-created_at', '-id')
+    ordering_param = 'ordering'
+    ordering_fields = ('priority', 'due_date', 'created_at')
+
+    def get_ordering(self, request, queryset, view):
+        param = request.query_params.get(self.ordering_param, '').strip()
+        if not param:
+            return self.ordering
+        fields = [name.strip() for name in param.split(',')]
+        names = [name.lstrip('-') for name in fields]
+        if not all(name in self.ordering_fields for name in names) or len(set(names)) != len(names):
+            raise serializers.ValidationError({
+                self.ordering_param: f'Use campos de {", ".join(self.ordering_fields)}, sem repetir.'
+            })
+        return (*fields, '-id' if fields[-1].startswith('-') else 'id')
+
+
+class UserCursorPagination(KeysetPagination):
+    """Paginação do diretório de usuários, em ordem alfabética de username"""
+
+    ordering = ('username',)
@@ -0,0 +1,113 @@
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+from .metrics import registry
+
+
+def _window_key(route, scope, ident, index):
+    digest = hashlib.md5(ident.encode(), usedforsecurity=False).hexdigest()
+    return f'ratelimit:{route}:{scope}:{digest}:{index}'
+
+
+def _incr(key, timeout):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, timeout):
+            return 1
+        return cache.incr(key)
+
+
+async def _aincr(key, timeout):
+    try:
+        return await cache.aincr(key)
+    except ValueError:
+        if await cache.aadd(key, 1, timeout):
+            return 1
+        return await cache.aincr(key)
+
+
+def _window(window):
+    index, elapsed = divmod(time.time(), window)
+    return int(index), elapsed
+
+
+def _wait(previous, current, limit, window, elapsed):
+    """Segundos a esperar pela estimativa da janela deslizante, ou 0 se dentro do limite"""
+    estimate = previous * (1 - elapsed / window) + current
+    if estimate <= limit:
+        return 0
+    return max(1, math.ceil(window - elapsed))
+
+
+def hit(route, scope, ident, limit, window):
+    """
+    Conta uma requisição na janela deslizante de `window` segundos e retorna
+    quantos segundos esperar se o limite foi ultrapassado, ou 0.
+
+    Janela deslizante aproximada por dois contadores de janela fixa: o da janela
+    atual mais o da anterior, ponderado pela parte dela que ainda está dentro dos
+    últimos `window` segundos. São duas chaves por identificador, sem lista de
+    horários, e não há rajada de 2x na virada da janela como no contador fixo.
+    Requisições recusadas também contam, então uma rajada contínua segue bloqueada.
+    """
+    index, elapsed = _window(window)
+    current = _incr(_window_key(route, scope, ident, index), window * 2)
+    previous = cache.get(_window_key(route, scope, ident, index - 1), 0)
+    return _wait(previous, current, limit, window, elapsed)
+
+
+async def ahit(route, scope, ident, limit, window):
+    """Versão assíncrona de hit()"""
+    index, elapsed = _window(window)
+    current = await _aincr(_window_key(route, scope, ident, index), window * 2)
+    previous = await cache.aget(_window_key(route, scope, ident, index - 1), 0)
+    return _wait(previous, current, limit, window, elapsed)
+
+
+def _limits(route, request, username):
+    """(escopo, identificador, limite, janela) de cada limite configurado para a rota"""
+    idents = {
+        # Mesma identificação de cliente dos throttles do DRF (respeita NUM_PROXIES)
+        'ip': BaseThrottle().get_ident(request),
+        'username': (username or '').strip().lower(),
+    }
+    for scope, (limit, window) in settings.RATE_LIMITS.get(route, {}).items():
+        if idents[scope]:
+            yield scope, idents[scope], limit, window
+
+
+def _record(route, scope, wait):
+    labels = (('route', route), ('scope', scope))
+    registry.inc('rate_limit_requests_total', labels)
+    if wait:
+        registry.inc('rate_limit_rejections_total', labels)
+
+
+def check_rate_limit(route, request, username=None):
+    """
+    Aplica os limites de RATE_LIMITS[route] por IP e por username e retorna os
+    segundos até a próxima tentativa (0 se liberada). Deve ser chamada antes de
+    qualquer trabalho caro, como o hash da senha.
+    """
+    wait = 0
+    for scope, ident, limit, window in _limits(route, request, username):
+        scope_wait = hit(route, scope, ident, limit, window)
+        _record(route, scope, scope_wait)
+        wait = max(wait, scope_wait)
+    return wait
+
+
+async def acheck_rate_limit(route, request, username=None):
+    """Versão assíncrona de check_rate_limit()"""
+    wait = 0
+    for scope, ident, limit, window in _limits(route, request, username):
+        scope_wait = await ahit(route, scope, ident, limit, window)
+        _record(route, scope, scope_wait)
+        wait = max(wait, scope_wait)
+    return wait
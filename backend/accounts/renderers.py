@@ -0,0 +1,94 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+# Bibliotecas opcionais: settings.py só registra as classes das que estão instaladas
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Converte o que os formatos não representam (datas, Decimal, textos lazy...) como o JSONRenderer
+default_encoder = encoders.JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer com orjson, codificado em C.
+
+    A saída é a mesma do JSONRenderer para textos, inteiros, datas (pelo encoder
+    do DRF, no formato de DATETIME_FORMAT) e para os floats das respostas da API.
+    Floats em notação científica podem sair com outra grafia do mesmo valor
+    (`1e16` em vez de `1e+16`), e NaN/infinito saem como null em vez de erro.
+    Respostas indentadas (`Accept: application/json; indent=4`, API navegável),
+    UNICODE_JSON=False e o que o orjson não codifica (inteiros além de 64 bits)
+    usam o JSONRenderer padrão.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=default_encoder.default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:
+            # orjson.JSONEncodeError é um TypeError
+            return super().render(data, accepted_media_type, renderer_context)
+        # Mesmo escape do JSONRenderer, para a saída ser um subconjunto de JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser com orjson, para corpos em UTF-8"""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        if encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Respostas em MessagePack (`Accept: application/msgpack`), menores que o JSON"""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=default_encoder.default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    """Corpos em MessagePack (`Content-Type: application/msgpack`), como os de /tasks/bulk/"""
+
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, TypeError) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
@@ -0,0 +1,105 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import RevokedToken
+
+# Sobreposição de cada sincronização com a anterior: cobre revogações gravadas
+# com `revoked_at` anterior a uma já lida, mas commitadas depois dela
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class RevocationSet:
+    """
+    Conjunto em memória dos `jti` revogados e ainda não expirados neste processo.
+
+    A verificação de cada requisição é uma busca num dicionário, sem banco. A
+    tabela `revoked_tokens` é a fonte da verdade: a cada JWT_REVOCATION_SYNC_INTERVAL
+    segundos uma requisição traz as revogações novas (pelo `revoked_at`) e descarta
+    as expiradas, então outros workers passam a rejeitar o token em até um
+    intervalo. No processo que revogou, o efeito é imediato.
+    """
+
+    def __init__(self):
+        self._expires = {}
+        self._lock = threading.Lock()
+        self._last_sync = None
+        self._synced_until = None
+
+    def __contains__(self, jti):
+        expires_at = self._expires.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def add(self, jti, expires_at):
+        self._expires[jti] = expires_at
+
+    def reset(self):
+        """Esvazia o conjunto e o marca como sincronizado agora"""
+        with self._lock:
+            self._expires = {}
+            self._last_sync = time.monotonic()
+            self._synced_until = timezone.now()
+
+    def _due(self):
+        return self._last_sync is None or time.monotonic() - self._last_sync >= settings.JWT_REVOCATION_SYNC_INTERVAL
+
+    def _start_sync(self):
+        """
+        (momento, consulta das revogações novas), ou None se não é hora ou outra
+        thread já está sincronizando; quem recebe a consulta fica com o lock
+        """
+        if not self._due() or not self._lock.acquire(blocking=False):
+            return None
+        now = timezone.now()
+        revoked = RevokedToken.objects.filter(expires_at__gt=now)
+        if self._synced_until is not None:
+            revoked = revoked.filter(revoked_at__gte=self._synced_until - SYNC_OVERLAP)
+        return now, revoked.order_by().values_list('jti', 'expires_at')
+
+    def _finish_sync(self, synced_until, rows):
+        now = time.time()
+        # Um novo dicionário, trocado de uma vez: as leituras concorrentes não usam lock
+        expires = {jti: expires_at for jti, expires_at in self._expires.items() if expires_at > now}
+        expires.update((jti, expires_at.timestamp()) for jti, expires_at in rows)
+        self._expires = expires
+        self._synced_until = synced_until
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        """Traz as revogações novas, se já passou o intervalo desde a última vez"""
+        started = self._start_sync()
+        if started is None:
+            return
+        synced_until, revoked = started
+        try:
+            self._finish_sync(synced_until, list(revoked))
+        finally:
+            self._lock.release()
+
+    async def async_sync(self):
+        """Versão assíncrona de sync()"""
+        started = self._start_sync()
+        if started is None:
+            return
+        synced_until, revoked = started
+        try:
+            self._finish_sync(synced_until, [row async for row in revoked])
+        finally:
+            self._lock.release()
+
+
+revoked_tokens = RevocationSet()
+
+
+def revoke_token(token, user=None):
+    """Revoga um token validado (access ou refresh) até a sua expiração"""
+    jti = token[api_settings.JTI_CLAIM]
+    expires_at = datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+    RevokedToken.objects.get_or_create(jti=jti, defaults={'expires_at': expires_at, 'user': user})
+    revoked_tokens.add(jti, expires_at.timestamp())
+    # Limpeza das revogações que já não importam, no caminho raro da escrita
+    RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
@@ -1,8 +1,31 @@
 # accounts/serializers.py
+from functools import partial
+from operator import itemgetter
+
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import transaction
 from rest_framework import serializers
+from rest_framework.settings import ISO_8601, api_settings
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 from django.utils import timezone
+from .cache import bump_task_version
 from .models import Task
+from .revocation import revoked_tokens
+
+def apply_completed_at(instance, validated_data):
+    """Ajusta a data de conclusão conforme a transição de status"""
+    if 'status' not in validated_data:
+        return
+    # Se mudando para concluída, definir data de conclusão
+    if validated_data['status'] == 'completed' and instance.status != 'completed':
+        validated_data['completed_at'] = timezone.now()
+    # Se mudando de concluída para outro status, remover data de conclusão
+    elif validated_data['status'] != 'completed' and instance.status == 'completed':
+        validated_data['completed_at'] = None
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -39,6 +62,29 @@ class LoginSerializer(serializers.Serializer):
             raise serializers.ValidationError("Username and password are required.")
         return data
 
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """Renovação de token que rejeita refresh tokens revogados (SIMPLE_JWT)"""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        revoked_tokens.sync()
+        if refresh.get(jwt_settings.JTI_CLAIM) in revoked_tokens:
+            raise TokenError('Token is revoked')
+        return super().validate(attrs)
+
+class LogoutSerializer(serializers.Serializer):
+    """Refresh token opcional, revogado junto com o access token da requisição"""
+    refresh = serializers.CharField(required=False)
+
+    def validate_refresh(self, value):
+        try:
+            token = RefreshToken(value)
+        except TokenError as exc:
+            raise serializers.ValidationError(str(exc))
+        if str(token.get(jwt_settings.USER_ID_CLAIM)) != str(self.context['request'].user.pk):
+            raise serializers.ValidationError('O token não pertence a este usuário.')
+        return token
+
 class TaskSerializer(serializers.ModelSerializer):
     """Serializer para o modelo Task"""
     
@@ -60,6 +106,123 @@ class TaskSerializer(serializers.ModelSerializer):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
+class FastTaskSerializer:
+    """
+    Serializer de leitura rápido para listas de tarefas.
+
+    Trabalha sobre linhas de `values()` (com o username via JOIN, sem N+1) e um
+    plano de campos montado uma vez por chamada, gerando exatamente a mesma
+    saída de TaskSerializer sem o custo por campo do ModelSerializer.
+
+    Com `fields` (ver parse_fields), só esses campos são gerados e `values()` só
+    busca as colunas de que eles dependem; o JOIN com o usuário só entra se `user`
+    for pedido.
+    """
+
+    fields = TaskSerializer.Meta.fields
+    # Colunas de values() usadas por cada campo
+    field_columns = {
+        'id': ('id',),
+        'title': ('title',),
+        'description': ('description',),
+        'priority': ('priority',),
+        'status': ('status',),
+        'due_date': ('due_date',),
+        'created_at': ('created_at',),
+        'updated_at': ('updated_at',),
+        'completed_at': ('completed_at',),
+        'user': ('user__username',),
+        'is_overdue': ('due_date', 'status'),
+        'is_completed': ('status',),
+    }
+    fields_query_param = 'fields'
+
+    def __init__(self, rows, fields=None):
+        self.rows = rows
+        if fields is not None:
+            self.fields = fields
+
+    @classmethod
+    def parse_fields(cls, request):
+        """
+        Lê o parâmetro `fields` (nomes separados por vírgula) e retorna os campos
+        pedidos na ordem padrão, ou None para todos. Campo desconhecido gera 400.
+        """
+        param = request.query_params.get(cls.fields_query_param, '').strip()
+        if not param:
+            return None
+        names = {name.strip() for name in param.split(',') if name.strip()}
+        unknown = names - set(cls.fields)
+        if unknown or not names:
+            raise serializers.ValidationError({
+                cls.fields_query_param: f'Use campos de {", ".join(cls.fields)}.'
+            })
+        return [name for name in cls.fields if name in names]
+
+    @classmethod
+    def values(cls, queryset, fields=None, extra=()):
+        """
+        Restringe o queryset às colunas usadas pelos campos (todos, por padrão),
+        mais as colunas de `extra`, como as da ordenação da paginação
+        """
+        columns = [column for name in fields or cls.fields for column in cls.field_columns[name]]
+        return queryset.values(*dict.fromkeys([*columns, *extra]))
+
+    @staticmethod
+    def datetime_formatter():
+        """Replica DateTimeField.to_representation para o formato ISO 8601"""
+        if not settings.USE_TZ or (api_settings.DATETIME_FORMAT or '').lower() != ISO_8601:
+            return serializers.DateTimeField().to_representation
+        current_timezone = timezone.get_current_timezone()
+
+        def format_datetime(value):
+            if not value:
+                return None
+            value = value.astimezone(current_timezone).isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        return format_datetime
+
+    def get_plan(self):
+        """Monta a lista (campo, função que extrai o valor da linha)"""
+        now = timezone.now()
+        format_datetime = self.datetime_formatter()
+
+        def datetime_getter(column):
+            return lambda row: format_datetime(row[column])
+
+        def is_overdue(row):
+            # Mesma regra de Task.is_overdue()
+            due_date = row['due_date']
+            return bool(due_date and row['status'] != 'completed' and now > due_date)
+
+        getters = {
+            'id': itemgetter('id'),
+            'title': itemgetter('title'),
+            'description': itemgetter('description'),
+            'priority': itemgetter('priority'),
+            'status': itemgetter('status'),
+            'due_date': datetime_getter('due_date'),
+            'created_at': datetime_getter('created_at'),
+            'updated_at': datetime_getter('updated_at'),
+            'completed_at': datetime_getter('completed_at'),
+            'user': itemgetter('user__username'),
+            'is_overdue': is_overdue,
+            'is_completed': lambda row: row['status'] == 'completed',
+        }
+        return [(name, getters[name]) for name in self.fields]
+
+    def iterate(self):
+        """Serializa as linhas sob demanda, útil para streaming"""
+        plan = self.get_plan()
+        for row in self.rows:
+            yield {name: getter(row) for name, getter in plan}
+
+    @property
+    def data(self):
+        return list(self.iterate())
+
 class TaskCreateSerializer(serializers.ModelSerializer):
     """Serializer simplificado para criação de tarefas"""
     
@@ -79,13 +242,7 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
         fields = ['title', 'description', 'priority', 'status', 'due_date']
     
     def update(self, instance, validated_data):
-        # Se mudando para concluída, definir data de conclusão
-        if validated_data.get('status') == 'completed' and instance.status != 'completed':
-            validated_data['completed_at'] = timezone.now()
-        # Se mudando de concluída para outro status, remover data de conclusão
-        elif validated_data.get('status') != 'completed' and instance.status == 'completed':
-            validated_data['completed_at'] = None
-        
+        apply_completed_at(instance, validated_data)
         return super().update(instance, validated_data)
 
 class TaskStatusSerializer(serializers.ModelSerializer):
@@ -104,3 +261,96 @@ class TaskStatusSerializer(serializers.ModelSerializer):
                 instance.completed_at = None
             instance.save()
         return instance
+
+class TaskBulkSerializer(serializers.Serializer):
+    """
+    Serializer para criação, atualização parcial e remoção de tarefas em lote.
+
+    Todos os itens são validados antes de qualquer escrita; se algum for inválido,
+    nada é gravado e os erros são retornados na posição de cada item.
+    """
+
+    create = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    update = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    def validate(self, data):
+        total = len(data['create']) + len(data['update']) + len(data['delete'])
+        if total > settings.TASK_BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                f"Máximo de {settings.TASK_BULK_MAX_ITEMS} itens por requisição."
+            )
+
+        user = self.context['request'].user
+        ids = [item.get('id') for item in data['update']] + data['delete']
+        tasks = Task.objects.filter(user=user).in_bulk(
+            [pk for pk in ids if isinstance(pk, int)]
+        )
+        # Erros no formato de many=True do DRF: uma entrada por item, vazia se válido
+        errors = {'create': [], 'update': [], 'delete': []}
+        not_found = {'id': ['Tarefa não encontrada ou repetida no lote.']}
+        seen = set()
+
+        creates = []
+        for item in data['create']:
+            serializer = TaskCreateSerializer(data=item)
+            if serializer.is_valid():
+                creates.append(serializer.validated_data)
+            errors['create'].append(serializer.errors)
+
+        updates = []
+        for item in data['update']:
+            task = tasks.get(item.get('id'))
+            if task is None or task.pk in seen:
+                errors['update'].append(not_found)
+                continue
+            seen.add(task.pk)
+            serializer = TaskUpdateSerializer(task, data=item, partial=True)
+            if serializer.is_valid():
+                updates.append((task, serializer.validated_data))
+            errors['update'].append(serializer.errors)
+
+        deletes = []
+        for pk in data['delete']:
+            if pk not in tasks or pk in seen:
+                errors['delete'].append(not_found)
+                continue
+            seen.add(pk)
+            deletes.append(pk)
+            errors['delete'].append({})
+
+        errors = {key: items for key, items in errors.items() if any(items)}
+        if errors:
+            raise serializers.ValidationError(errors)
+        return {'create': creates, 'update': updates, 'delete': deletes}
+
+    def save(self):
+        # O campo `create` ocupa o nome do método create(), por isso save() grava direto
+        validated_data = self.validated_data
+        user = self.context['request'].user
+        now = timezone.now()
+
+        created = [Task(user=user, **data) for data in validated_data['create']]
+        updated = []
+        fields = {'updated_at'}
+        for task, data in validated_data['update']:
+            data = dict(data)
+            apply_completed_at(task, data)
+            for attr, value in data.items():
+                setattr(task, attr, value)
+            task.updated_at = now
+            task.user = user
+            fields.update(data)
+            updated.append(task)
+
+        with transaction.atomic():
+            if created:
+                Task.objects.bulk_create(created)
+            if updated:
+                Task.objects.bulk_update(updated, sorted(fields))
+            if validated_data['delete']:
+                Task.objects.filter(user=user, pk__in=validated_data['delete']).delete_with_tombstones()
+            # bulk_create/bulk_update não disparam post_save; a versão muda só após o commit
+            transaction.on_commit(partial(bump_task_version, user.pk))
+
+        return {'created': created, 'updated': updated, 'deleted': validated_data['delete']}
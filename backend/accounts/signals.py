@@ -0,0 +1,39 @@
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .authentication import user_cache
+from .cache import bump_task_version
+from .metrics import record_query
+from .models import Task
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, instance, **kwargs):
+    """
+    Invalida os caches derivados das tarefas sempre que uma tarefa é alterada.
+
+    Só depois do commit: com a versão nova antes dele, uma leitura concorrente
+    ainda veria as linhas antigas e as guardaria no cache (e no ETag) da versão nova.
+    """
+    transaction.on_commit(partial(bump_task_version, instance.user_id), using=kwargs['using'])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Remove o usuário do cache de autenticação (inclui troca de senha e desativação)"""
+    user_cache.invalidate(instance.pk)
+    # O username aparece nas respostas de tarefas
+    transaction.on_commit(partial(bump_task_version, instance.pk), using=kwargs['using'])
+
+
+@receiver(connection_created)
+def install_query_metrics(sender, connection, **kwargs):
+    """Conta as consultas de cada requisição para as métricas (ver metrics.py)"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
@@ -0,0 +1,99 @@
+import base64
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+
+from .models import Task, TaskTombstone
+from .serializers import FastTaskSerializer
+
+
+class TaskSync:
+    """
+    Sincronização incremental das tarefas de um usuário.
+
+    O cursor guarda duas posições keyset: (updated_at, id) da última tarefa alterada
+    e (deleted_at, id) do último tombstone entregue. Cada chamada devolve só o que
+    mudou depois delas, então o tamanho da resposta acompanha o volume de mudanças,
+    não o total de tarefas.
+
+    Mudanças dos últimos TASK_SYNC_SAFETY_WINDOW segundos ficam para a chamada
+    seguinte: `updated_at` é definido antes do commit, e uma transação ainda aberta
+    poderia gravar uma linha com horário anterior a uma já entregue.
+    """
+
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def __init__(self, user, limit):
+        self.user = user
+        self.limit = limit
+
+    def get_changes(self, cursor=None):
+        changed_after, deleted_after = self.decode_cursor(cursor)
+        until = timezone.now() - timedelta(seconds=settings.TASK_SYNC_SAFETY_WINDOW)
+
+        tasks = Task.objects.filter(user=self.user, updated_at__lte=until).order_by('updated_at', 'id')
+        if changed_after is not None:
+            tasks = tasks.filter(self.after(changed_after, 'updated_at'))
+        changed = list(FastTaskSerializer.values(tasks)[:self.limit + 1])
+
+        if deleted_after is None:
+            # Primeira sincronização: o cliente ainda não tem tarefas para remover
+            deleted_after = (until, 0)
+            deleted = []
+        else:
+            tombstones = TaskTombstone.objects.filter(
+                self.after(deleted_after, 'deleted_at'), user=self.user, deleted_at__lte=until,
+            ).order_by('deleted_at', 'id')
+            deleted = list(tombstones.values_list('deleted_at', 'id', 'task_id')[:self.limit + 1])
+
+        has_more = len(changed) > self.limit or len(deleted) > self.limit
+        changed, deleted = changed[:self.limit], deleted[:self.limit]
+        if changed:
+            changed_after = (changed[-1]['updated_at'], changed[-1]['id'])
+        if deleted:
+            deleted_after = deleted[-1][:2]
+
+        return {
+            'changed': FastTaskSerializer(changed).data,
+            'deleted': [task_id for _, _, task_id in deleted],
+            'cursor': self.encode_cursor(changed_after, deleted_after),
+            'has_more': has_more,
+        }
+
+    @staticmethod
+    def after(position, field):
+        moment, pk = position
+        return Q(**{f'{field}__gt': moment}) | Q(**{field: moment, 'id__gt': pk})
+
+    def encode_cursor(self, changed_after, deleted_after):
+        def encode(position):
+            return None if position is None else [position[0].isoformat(), position[1]]
+        payload = json.dumps({'c': encode(changed_after), 'd': encode(deleted_after)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None, None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            positions = []
+            for key in ('c', 'd'):
+                value = data[key]
+                if value is None:
+                    positions.append(None)
+                    continue
+                moment, pk = value
+                moment = parse_datetime(moment)
+                if moment is None or not isinstance(pk, int):
+                    raise ValueError
+                positions.append((moment, pk))
+            if positions[1] is None:
+                raise ValueError
+            return positions
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
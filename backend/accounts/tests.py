@@ -1,3 +1,1257 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgreSQLDatabaseWrapper
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import renderers
+from .admin import TaskAdmin
+from .authentication import user_cache
+from .cache import get_task_version
+from .db_router import RoutingState, _replica_health, is_pinned_to_primary, routing_state
+from .executors import login_executor
+from .management.commands import import_users
+from .ratelimit import _wait
+from .metrics import registry
+from .models import ArchivedTask, RevokedToken, Task
+from .pagination import TaskCursorPagination
+from .revocation import revoked_tokens
+from .serializers import FastTaskSerializer, TaskSerializer
+from .views import TaskStatsView
 
 # Create your tests here.
+
+def share_replica_connections(test):
+    """
+    As réplicas espelham o banco de teste; usando a mesma conexão do primário elas
+    enxergam os dados da transação do teste (no SQLite em memória, uma segunda
+    conexão ficaria bloqueada por ela)
+    """
+    for alias in settings.DATABASE_REPLICAS:
+        test.addCleanup(connections.__setitem__, alias, connections[alias])
+        connections[alias] = connections[DEFAULT_DB_ALIAS]
+
+
+def postgresql_connection(test):
+    """
+    Conexão do PostgreSQL registrada como 'postgresql', só para compilar consultas
+    (sem conectar): os caminhos do PostgreSQL não rodam nos testes em SQLite
+    """
+    postgresql = PostgreSQLDatabaseWrapper(
+        {**connection.settings_dict, 'ENGINE': 'django.db.backends.postgresql'}, alias='postgresql',
+    )
+    connections['postgresql'] = postgresql
+    test.addCleanup(connections.__delitem__, 'postgresql')
+    return postgresql
+
+
+class CommittingAPIClient(APIClient):
+    """
+    APIClient que executa os callbacks de on_commit ao fim de cada requisição,
+    como o commit dela faria fora da transação do TestCase
+    """
+
+    def request(self, **kwargs):
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            return super().request(**kwargs)
+
+
+class TaskAPITestCase(TestCase):
+    """Base para os testes das APIs de tarefas"""
+
+    def setUp(self):
+        share_replica_connections(self)
+        cache.clear()
+        user_cache.clear()
+        revoked_tokens.reset()
+        self.user = User.objects.create_user(username='ana', password='senha-forte-123')
+        self.client = CommittingAPIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_task(self, **kwargs):
+        kwargs.setdefault('title', 'Tarefa')
+        kwargs.setdefault('user', self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            return Task.objects.create(**kwargs)
+
+
+class TaskStatsViewTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        self.create_task(status='completed', priority='high')
+        self.create_task(status='pending', priority='low', due_date=now - timedelta(days=1))
+        self.create_task(status='in_progress', priority='urgent', due_date=now + timedelta(days=1))
+        self.create_task(status='cancelled', due_date=now - timedelta(days=1))
+        other = User.objects.create_user(username='bruno', password='senha-forte-123')
+        self.create_task(user=other, status='pending')
+
+    def test_stats(self):
+        response = self.client.get(reverse('task-stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'total': 4,
+            'completed': 1,
+            'pending': 1,
+            'in_progress': 1,
+            'cancelled': 1,
+            'overdue': 1,
+            'by_priority': {'low': 1, 'medium': 1, 'high': 1, 'urgent': 1},
+        })
+
+    def test_get_does_not_depend_on_etag_hook(self):
+        class StatsWithoutETag(TaskStatsView):
+            def get_etag(self, request):
+                return None
+
+        request = APIRequestFactory().get(reverse('task-stats'))
+        force_authenticate(request, self.user)
+        response = StatsWithoutETag.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total'], 4)
+
+    def test_stats_use_single_query_and_cache(self):
+        with self.assertNumQueries(1):
+            self.client.get(reverse('task-stats'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('task-stats'))
+
+    def test_stats_cache_invalidated_on_write(self):
+        self.client.get(reverse('task-stats'))
+        task = self.create_task(status='pending')
+        self.assertEqual(self.client.get(reverse('task-stats')).json()['total'], 5)
+        with self.captureOnCommitCallbacks(execute=True):
+            task.delete()
+        self.assertEqual(self.client.get(reverse('task-stats')).json()['total'], 4)
+
+
+class TaskOverdueTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        past = timezone.now() - timedelta(hours=1)
+        self.late = self.create_task(title='Atrasada', status='pending', due_date=past)
+        self.create_task(status='in_progress', due_date=timezone.now() + timedelta(days=1))
+        self.create_task(status='completed', due_date=past)
+        self.create_task(status='cancelled', due_date=past)
+        self.create_task(status='pending')
+
+    def test_overdue_queryset(self):
+        self.assertEqual(list(Task.objects.overdue()), [self.late])
+        flags = dict(Task.objects.with_overdue().values_list('id', 'overdue'))
+        self.assertEqual([pk for pk, overdue in flags.items() if overdue], [self.late.pk])
+
+    def test_overdue_action(self):
+        response = self.client.get(reverse('task-overdue'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task['id'] for task in response.json()['results']], [self.late.pk])
+
+
+class TaskPaginationTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Mesmo created_at para todas, forçando o desempate pelo id
+        created_at = timezone.now()
+        self.tasks = [self.create_task(title=f'Tarefa {i}') for i in range(7)]
+        Task.objects.update(created_at=created_at)
+        self.expected = sorted((task.pk for task in self.tasks), reverse=True)
+
+    def walk(self, url):
+        ids = []
+        while url:
+            data = self.client.get(url).json()
+            ids.extend(task['id'] for task in data['results'])
+            url = data['next']
+        return ids
+
+    def test_walks_all_pages_in_order(self):
+        self.assertEqual(self.walk(reverse('task-list') + '?page_size=3'), self.expected)
+        self.assertEqual(self.walk(reverse('my-tasks') + '?page_size=2'), self.expected)
+
+    def test_stable_under_concurrent_inserts(self):
+        data = self.client.get(reverse('task-list') + '?page_size=3').json()
+        self.create_task(title='Nova')
+        ids = [task['id'] for task in data['results']] + self.walk(data['next'])
+        self.assertEqual(ids, self.expected)
+
+    def test_previous_link(self):
+        first = self.client.get(reverse('task-completed'))
+        self.assertIsNone(first.json()['previous'])
+        data = self.client.get(reverse('task-list') + '?page_size=3').json()
+        second = self.client.get(data['next']).json()
+        previous = self.client.get(second['previous']).json()
+        self.assertEqual(previous['results'], data['results'])
+
+    def test_cursor_condition_bounds_the_index_range(self):
+        data = self.client.get(reverse('task-list') + '?page_size=3').json()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(data['next'])
+        sql = next(q['sql'] for q in queries if 'FROM "tasks"' in q['sql'])
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = '\n'.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn('tasks_user_created_idx (user_id=? AND created_at<?)', plan)
+
+        # No PostgreSQL: comparação de tuplas, mais o limite no primeiro campo
+        postgresql = postgresql_connection(self)
+        queryset = Task.objects.using('postgresql').filter(user=self.user)
+        paginator = TaskCursorPagination()
+        request = APIRequestFactory().get(data['next'])
+        queryset = paginator.get_page_queryset(queryset, Request(request))
+        sql, _ = queryset.query.get_compiler(connection=postgresql).as_sql()
+        self.assertIn('"tasks"."created_at" <= %s AND ("tasks"."created_at", "tasks"."id") < (%s, %s)', sql)
+
+    def test_page_size_limit_and_invalid_cursor(self):
+        with self.settings(PAGINATION_MAX_PAGE_SIZE=5):
+            data = self.client.get(reverse('task-list') + '?page_size=100').json()
+        self.assertEqual(len(data['results']), 5)
+        response = self.client.get(reverse('task-list') + '?cursor=invalido')
+        self.assertEqual(response.status_code, 404)
+
+
+class TaskOrderingTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        specs = [
+            ('low', now + timedelta(days=1)), ('urgent', None), ('urgent', now + timedelta(days=2)),
+            ('medium', None), ('urgent', now + timedelta(days=1)), ('high', now), ('low', None),
+        ]
+        self.tasks = [self.create_task(priority=priority, due_date=due) for priority, due in specs]
+
+    def walk(self, ordering, page_size=2):
+        url = reverse('task-list') + f'?ordering={ordering}&page_size={page_size}'
+        ids = []
+        while url:
+            data = self.client.get(url).json()
+            ids.extend(task['id'] for task in data['results'])
+            url = data['next']
+        return ids
+
+    def expected(self, key):
+        return [task.pk for task in sorted(self.tasks, key=key)]
+
+    def test_priority_rank_then_due_date(self):
+        rank = ['low', 'medium', 'high', 'urgent'].index
+        # Nulos por último em ordem crescente
+        expected = self.expected(lambda t: (-rank(t.priority), t.due_date is None, t.due_date or 0, t.pk))
+        self.assertEqual(self.walk('-priority,due_date'), expected)
+
+    def test_descending_nullable_field(self):
+        # Nulos primeiro em ordem decrescente
+        expected = self.expected(lambda t: (t.due_date is not None, -(t.due_date.timestamp() if t.due_date else 0), -t.pk))
+        self.assertEqual(self.walk('-due_date'), expected)
+        self.assertEqual(self.walk('-due_date', page_size=3), expected)
+
+    def test_previous_link_with_ordering(self):
+        url = reverse('task-list') + '?ordering=-priority,due_date&page_size=3'
+        first = self.client.get(url).json()
+        second = self.client.get(first['next']).json()
+        self.assertEqual(self.client.get(second['previous']).json()['results'], first['results'])
+
+    def test_invalid_ordering(self):
+        for ordering in ('title', 'priority,-priority'):
+            response = self.client.get(reverse('task-list'), {'ordering': ordering})
+            self.assertEqual(response.status_code, 400)
+
+
+class TaskIntegerChoicesTests(TaskAPITestCase):
+
+    def test_stored_as_integers_and_exposed_as_codes(self):
+        task = self.create_task(priority='urgent', status='in_progress')
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT priority, status FROM tasks WHERE id = %s', [task.pk])
+            self.assertEqual(cursor.fetchone(), (4, 2))
+        data = self.client.get(reverse('task-list')).json()['results'][0]
+        self.assertEqual((data['priority'], data['status']), ('urgent', 'in_progress'))
+        task.refresh_from_db()
+        self.assertEqual(task.get_priority_display(), 'Urgente')
+
+    def test_unknown_code_filters_to_nothing(self):
+        self.create_task(priority='high')
+        response = self.client.get(reverse('task-by-priority'), {'priority': 'altissima'})
+        self.assertEqual(response.json()['results'], [])
+        response = self.client.post(reverse('task-list'), {'title': 'X', 'priority': 'altissima'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskQueryPlanTests(TaskAPITestCase):
+    """Garante que as consultas das listagens de tarefas usam índices"""
+
+    # URL -> índices que podem atender a consulta da página
+    urls = {
+        reverse('task-list'): ['tasks_user_created_idx'],
+        reverse('task-completed'): ['tasks_user_status_created_idx'],
+        reverse('task-pending'): ['tasks_user_status_created_idx'],
+        reverse('task-overdue'): ['tasks_user_open_due_idx'],
+        reverse('task-by-priority') + '?priority=high': ['tasks_user_prio_created_idx'],
+        reverse('my-tasks'): ['tasks_user_created_idx'],
+        reverse('my-tasks') + '?status=pending': ['tasks_user_status_created_idx'],
+        reverse('my-tasks') + '?priority=urgent': ['tasks_user_prio_created_idx'],
+        reverse('my-tasks') + '?status=pending&priority=urgent': [
+            'tasks_user_status_created_idx', 'tasks_user_prio_created_idx',
+        ],
+    }
+    # As atrasadas são buscadas pelo vencimento (poucas linhas) e ordenadas depois
+    sorted_urls = {reverse('task-overdue')}
+
+    def setUp(self):
+        super().setUp()
+        users = [self.user] + [
+            User.objects.create(username=f'usuario{i}') for i in range(19)
+        ]
+        due = timezone.now() + timedelta(days=1)
+        Task.objects.bulk_create([
+            Task(
+                user=user, title=f'Tarefa {i}', due_date=due,
+                status=Task.STATUS_CHOICES[i % 4][0],
+                priority=Task.PRIORITY_CHOICES[i % 4][0],
+            )
+            for user in users for i in range(100)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Com poucas linhas o seq scan venceria; sem ele, o plano mostra qual índice serve
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN {sql}')
+            else:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+    def is_full_scan(self, plan):
+        if connection.vendor == 'postgresql':
+            return 'Seq Scan on tasks' in plan
+        return any(line.startswith('SCAN tasks') for line in plan.splitlines())
+
+    def has_sort(self, plan):
+        if connection.vendor == 'postgresql':
+            return any(line.strip().startswith('Sort') for line in plan.splitlines())
+        return 'USE TEMP B-TREE FOR ORDER BY' in plan
+
+    def test_task_list_queries_use_indexes(self):
+        for url, indexes in self.urls.items():
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            task_queries = [q['sql'] for q in queries if 'FROM "tasks"' in q['sql']]
+            self.assertTrue(task_queries, url)
+            for sql in task_queries:
+                plan = self.explain(sql)
+                self.assertFalse(self.is_full_scan(plan), f'{url}: {plan}')
+
+            # A consulta da página usa os índices compostos, já na ordem da listagem
+            plan = self.explain(next(sql for sql in task_queries if 'LIMIT' in sql))
+            self.assertTrue(any(index in plan for index in indexes), f'{url}: {plan}')
+            if url not in self.sorted_urls:
+                self.assertFalse(self.has_sort(plan), f'{url}: {plan}')
+
+
+class TaskBulkTests(TaskAPITestCase):
+
+    def test_bulk_create_update_delete(self):
+        done = self.create_task(title='Feita', status='completed', completed_at=timezone.now())
+        todo = self.create_task(title='A fazer')
+        gone = self.create_task(title='Remover')
+        self.client.get(reverse('task-stats'))
+
+        # Busca, savepoint, insert, update, ids + tombstones + select/delete da remoção e release
+        with self.assertNumQueries(9):
+            response = self.client.post(reverse('task-bulk'), {
+                'create': [{'title': 'Nova 1'}, {'title': 'Nova 2', 'priority': 'high'}],
+                'update': [
+                    {'id': todo.pk, 'status': 'completed'},
+                    {'id': done.pk, 'status': 'pending'},
+                ],
+                'delete': [gone.pk],
+            }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()
+        self.assertEqual([task['title'] for task in data['created']], ['Nova 1', 'Nova 2'])
+        self.assertEqual(data['deleted'], [gone.pk])
+
+        todo.refresh_from_db()
+        done.refresh_from_db()
+        self.assertIsNotNone(todo.completed_at)
+        self.assertIsNone(done.completed_at)
+        self.assertFalse(Task.objects.filter(pk=gone.pk).exists())
+        self.assertEqual(self.client.get(reverse('task-stats')).json()['total'], 4)
+
+    def test_bulk_is_atomic_with_item_errors(self):
+        other = User.objects.create(username='bruno')
+        foreign = self.create_task(user=other)
+        response = self.client.post(reverse('task-bulk'), {
+            'create': [{'title': 'Válida'}, {'priority': 'high'}],
+            'update': [{'id': foreign.pk, 'title': 'Invasão'}],
+            'delete': [foreign.pk],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(errors['create'][0], {})
+        self.assertIn('title', errors['create'][1])
+        self.assertIn('id', errors['update'][0])
+        self.assertIn('id', errors['delete'][0])
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 0)
+
+    def test_bulk_limit(self):
+        with self.settings(TASK_BULK_MAX_ITEMS=1):
+            response = self.client.post(reverse('task-bulk'), {
+                'create': [{'title': 'Um'}, {'title': 'Dois'}],
+            }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskExportTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.create_task(title='Alta', priority='high', description='Com "aspas", e vírgula')
+        self.create_task(title='Baixa', priority='low')
+        self.create_task(user=User.objects.create(username='bruno'), title='Outra')
+
+    def content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_export(self):
+        response = self.client.get(reverse('task-export'))
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        expected = json.loads(json.dumps(
+            TaskSerializer(Task.objects.filter(user=self.user), many=True).data
+        ))
+        self.assertEqual(rows, expected)
+
+    def test_csv_export_with_filters(self):
+        response = self.client.get(reverse('task-export') + '?output=csv&priority=high')
+        rows = list(csv.DictReader(io.StringIO(self.content(response))))
+        self.assertEqual([row['title'] for row in rows], ['Alta'])
+        self.assertEqual(rows[0]['description'], 'Com "aspas", e vírgula')
+        self.assertEqual(rows[0]['user'], 'ana')
+
+    def test_invalid_output(self):
+        response = self.client.get(reverse('task-export') + '?output=xml')
+        self.assertEqual(response.status_code, 400)
+
+
+class FastTaskSerializerTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        self.create_task(title='Atrasada', description='Descrição', due_date=now - timedelta(days=1))
+        self.create_task(title='Concluída', status='completed', completed_at=now, due_date=now - timedelta(days=2))
+        self.create_task(title='Futura', priority='urgent', due_date=now + timedelta(days=1))
+        self.create_task(title='Sem data', status='cancelled')
+
+    def test_output_is_byte_identical(self):
+        tasks = Task.objects.filter(user=self.user)
+        expected = JSONRenderer().render(TaskSerializer(tasks, many=True).data)
+        fast = JSONRenderer().render(FastTaskSerializer(FastTaskSerializer.values(tasks)).data)
+        self.assertEqual(fast, expected)
+
+    def test_list_without_n_plus_one(self):
+        # Consulta das tarefas + próximo vencimento do ETag (feita uma vez por versão)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('task-list'))
+        self.assertEqual(len(response.json()['results']), 4)
+
+
+class CachedJWTAuthenticationTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_warm_requests_skip_user_query(self):
+        with self.assertNumQueries(3):
+            self.client.get(reverse('task-list'))
+        # Usuário e listagem vêm do cache
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('task-list'))
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('protected'))
+        self.assertEqual(response.json(), {'msg': 'Olá, ana!'})
+
+    def test_cache_invalidated_on_user_changes(self):
+        self.client.get(reverse('protected'))
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('protected')).status_code, 401)
+
+    def test_cache_expires_after_ttl(self):
+        with self.settings(AUTH_USER_CACHE_TTL=0):
+            self.client.get(reverse('protected'))
+            with self.assertNumQueries(1):
+                self.client.get(reverse('protected'))
+
+
+class AsyncLoginViewTests(TransactionTestCase):
+    """O login roda em outra thread, então os dados precisam estar commitados"""
+
+    def setUp(self):
+        login_executor.shutdown()
+        # Contadores do limite de taxa
+        cache.clear()
+        User.objects.create_user(username='ana', password='senha-forte-123')
+        self.client = APIClient()
+
+    def tearDown(self):
+        login_executor.shutdown()
+
+    def login(self, **data):
+        return self.client.post(reverse('token_obtain_pair'), data, format='json')
+
+    def test_login_returns_token_pair(self):
+        response = self.login(username='ana', password='senha-forte-123')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {'refresh', 'access'})
+
+    def test_invalid_credentials(self):
+        response = self.login(username='ana', password='errada')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="api"')
+        response = self.login(username='ana')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json())
+
+    def test_rejects_when_saturated(self):
+        release = threading.Event()
+        with self.settings(LOGIN_EXECUTOR_WORKERS=1, LOGIN_EXECUTOR_QUEUE_SIZE=0):
+            busy = login_executor.submit(release.wait)
+            response = self.login(username='ana', password='senha-forte-123')
+            release.set()
+            busy.result()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_rate_limited_per_username(self):
+        with self.settings(RATE_LIMITS={'login': {'ip': (100, 60), 'username': (2, 60)}}):
+            for _ in range(2):
+                self.assertEqual(self.login(username='ana', password='errada').status_code, 401)
+            # Recusado antes do hash, mesmo com a senha correta
+            response = self.login(username=' ANA', password='senha-forte-123')
+            self.assertEqual(response.status_code, 429)
+            self.assertGreater(int(response['Retry-After']), 0)
+            self.assertEqual(self.login(username='bia', password='errada').status_code, 401)
+
+
+class ImportUsersCommandTests(TestCase):
+
+    def write(self, suffix, content):
+        handle = tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False, encoding='utf-8')
+        self.addCleanup(os.unlink, handle.name)
+        with handle:
+            handle.write(content)
+        return handle.name
+
+    def run_command(self, *args):
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_users', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_csv(self):
+        User.objects.create(username='existente')
+        path = self.write('.csv', (
+            'username,email,password\n'
+            'carla,CARLA@Example.com,senha-1\n'
+            'diego,,senha-2\n'
+            'existente,,senha-3\n'
+            'carla,,senha-4\n'
+            'sem senha,,\n'
+        ))
+        out, err = self.run_command(path, '--workers', '2', '--batch-size', '1')
+        self.assertIn('2 usuários criados, 3 falhas', out)
+        self.assertIn('linha 4: usuário "existente" já existe', err)
+        self.assertIn('linha 5: usuário "carla" repetido no arquivo', err)
+        self.assertIn('linha 6:', err)
+        carla = User.objects.get(username='carla')
+        self.assertEqual(carla.email, 'CARLA@example.com')
+        self.assertTrue(carla.check_password('senha-1'))
+
+    def test_conflicting_row_does_not_reject_batch(self):
+        class ConcurrentImport(import_users.Command):
+            def dedupe(self, rows, failures):
+                rows = super().dedupe(rows, failures)
+                # Criado por outro processo depois da verificação de duplicados
+                User.objects.create(username='diego')
+                return rows
+
+        path = self.write('.csv', 'username,email,password\ncarla,,senha-1\ndiego,,senha-2\neva,,senha-3\n')
+        out, err = io.StringIO(), io.StringIO()
+        call_command(ConcurrentImport(), path, '--workers', '1', stdout=out, stderr=err)
+        self.assertIn('2 usuários criados, 1 falhas', out.getvalue())
+        self.assertIn('linha 3: usuário "diego" rejeitado', err.getvalue())
+        self.assertEqual(User.objects.filter(username__in=['carla', 'eva']).count(), 2)
+
+    def test_import_jsonl(self):
+        path = self.write('.jsonl', (
+            '{"username": "eva", "password": "senha-1"}\n'
+            'não é json\n'
+        ))
+        out, err = self.run_command(path, '--workers', '1')
+        self.assertIn('1 usuários criados, 1 falhas', out)
+        self.assertIn('linha 2: JSON inválido', err)
+        self.assertTrue(User.objects.get(username='eva').check_password('senha-1'))
+
+    def test_invalid_types_and_email_are_row_failures(self):
+        path = self.write('.jsonl', (
+            '{"username": 123, "password": 456}\n'
+            '{"username": "fabio", "password": ["senha"]}\n'
+            '{"username": "gil", "password": "senha-1", "email": "sem-arroba"}\n'
+            '{"username": "hana", "password": "senha-2", "email": "hana@example.com"}\n'
+        ))
+        out, err = self.run_command(path, '--workers', '2')
+        self.assertIn('1 usuários criados, 3 falhas', out)
+        self.assertIn('linha 1: username, email e password precisam ser textos', err)
+        self.assertIn('linha 2: username, email e password precisam ser textos', err)
+        self.assertIn('linha 3: e-mail inválido', err)
+        self.assertEqual(User.objects.get(username='hana').email, 'hana@example.com')
+
+
+class BenchApiCommandTests(TransactionTestCase):
+
+    def test_reports_and_enforces_budgets(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'resultados.json')
+            call_command('bench_api', users=2, tasks=5, requests=2, output=output, stdout=io.StringIO())
+            with open(output) as source:
+                results = json.load(source)
+            self.assertEqual(results['meta']['tasks'], 5)
+            self.assertIn('tasks_list', results['endpoints'])
+            self.assertEqual(results['endpoints']['logout']['statuses'], [200])
+            self.assertEqual(set(results['endpoints']['login']), {'p50_ms', 'p95_ms', 'p99_ms', 'rps', 'queries', 'statuses'})
+            # Leituras que podem ir às réplicas também são contadas
+            self.assertEqual(results['endpoints']['users']['queries'], 1)
+
+            budgets = os.path.join(directory, 'orcamento.json')
+            with open(budgets, 'w') as target:
+                json.dump({'endpoints': {'tasks_list': {'queries': 0}}}, target)
+            stdout = io.StringIO()
+            with self.assertRaisesMessage(CommandError, 'consultas (máximo 0)'):
+                call_command('bench_api', users=1, tasks=5, requests=1, budgets=budgets, compare=output, stdout=stdout)
+            self.assertIn('x  SQL', stdout.getvalue())
+        self.assertFalse(User.objects.filter(username__startswith='bench-api-').exists())
+
+
+class AsyncTaskViewsTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        self.task = self.create_task(title='Atrasada', priority='high', due_date=now - timedelta(days=1))
+        self.create_task(title='Concluída', status='completed', completed_at=now)
+        self.create_task(title='Pendente', priority='low')
+        token = RefreshToken.for_user(self.user).access_token
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_matches_sync_views(self):
+        pairs = [
+            (reverse('task-list') + '?page_size=2', reverse('async-task-list') + '?page_size=2'),
+            (reverse('task-completed'), reverse('async-task-completed')),
+            (reverse('task-pending'), reverse('async-task-pending')),
+            (reverse('task-overdue'), reverse('async-task-overdue')),
+            (reverse('task-by-priority') + '?priority=high', reverse('async-task-by-priority') + '?priority=high'),
+            (reverse('task-detail', args=[self.task.pk]), reverse('async-task-detail', args=[self.task.pk])),
+            (reverse('task-stats'), reverse('async-task-stats')),
+        ]
+        for sync_url, async_url in pairs:
+            sync_response = self.client.get(sync_url)
+            async_response = self.client.get(async_url)
+            self.assertEqual(async_response.status_code, 200, async_url)
+            expected = sync_response.content.replace(b'/api/tasks/', b'/api/async/tasks/')
+            self.assertEqual(async_response.content, expected, async_url)
+
+    def test_authentication_and_not_found(self):
+        response = self.client.get(reverse('async-task-detail', args=[999]))
+        self.assertEqual(response.status_code, 404)
+        response = APIClient().get(reverse('async-task-list'))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="api"')
+
+
+class UserDirectoryTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        User.objects.bulk_create([
+            User(username='beatriz', email='bia@example.com'),
+            User(username='bruno', email='contato@bruno.dev'),
+            User(username='carla', email='beto@example.com'),
+            User(username='diego', email='diego@example.com'),
+        ])
+
+    def test_paginated_alphabetical_listing(self):
+        data = self.client.get(reverse('users') + '?page_size=3').json()
+        self.assertEqual([user['username'] for user in data['results']], ['ana', 'beatriz', 'bruno'])
+        self.assertEqual(set(data['results'][0]), {'id', 'username', 'email', 'date_joined'})
+        data = self.client.get(data['next']).json()
+        self.assertEqual([user['username'] for user in data['results']], ['carla', 'diego'])
+        self.assertIsNone(data['next'])
+
+    def test_prefix_search_on_username_and_email(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(reverse('users') + '?search=BE').json()
+        self.assertEqual([user['username'] for user in data['results']], ['beatriz', 'carla'])
+        self.assertNotIn('password', queries[0]['sql'])
+
+
+class ConditionalRequestTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.task = self.create_task(title='Relatório', due_date=timezone.now() + timedelta(days=1))
+
+    def test_not_modified_without_querying_tasks(self):
+        etag = self.client.get(reverse('task-list'))['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('task-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_if_none_match_star_requires_existing_task(self):
+        # Detalhe do ViewSet e da TaskDetailView
+        for prefix in ('/api/tasks/', '/api/my-tasks/'):
+            response = self.client.get(f'{prefix}{self.task.pk}/', HTTP_IF_NONE_MATCH='*')
+            self.assertEqual(response.status_code, 304)
+            response = self.client.get(f'{prefix}99999/', HTTP_IF_NONE_MATCH='*')
+            self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get(reverse('task-list'), HTTP_IF_NONE_MATCH='*').status_code, 304)
+
+    def test_etag_changes_after_write(self):
+        etag = self.client.get(reverse('task-stats'))['ETag']
+        self.create_task(title='Nova')
+        response = self.client.get(reverse('task-stats'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_query_string(self):
+        first = self.client.get(reverse('task-list'))['ETag']
+        second = self.client.get(reverse('task-list'), {'status': 'pending'})['ETag']
+        self.assertNotEqual(first, second)
+
+    def test_stale_if_match_rejected(self):
+        url = reverse('task-detail', args=[self.task.pk])
+        etag = self.client.get(url)['ETag']
+        self.create_task(title='Outra')
+        response = self.client.put(url, {'title': 'X'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, 'Relatório')
+
+        etag = self.client.get(url)['ETag']
+        response = self.client.put(url, {'title': 'X'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class ResponseCacheTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        registry.reset()
+        self.task = self.create_task(status='pending', priority='high')
+        self.url = reverse('task-pending')
+
+    def test_repeated_requests_hit_cache(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.json()['results']), 1)
+        text = self.client.get('/metrics').content.decode()
+        self.assertIn('task_response_cache_total{result="hit"} 1', text)
+        self.assertIn('task_response_cache_total{result="miss"} 1', text)
+
+    def test_query_params_normalized(self):
+        url = reverse('my-tasks')
+        self.client.get(url, {'status': 'pending', 'priority': 'high'})
+        self.client.get(url + '?priority=high&status=pending&page_size=')
+        text = self.client.get('/metrics').content.decode()
+        self.assertIn('task_response_cache_total{result="hit"} 1', text)
+        self.assertIn('task_response_cache_total{result="miss"} 1', text)
+
+    def test_invalidated_on_writes(self):
+        self.client.get(self.url)
+        self.client.patch(reverse('task-mark-completed', args=[self.task.pk]))
+        self.assertEqual(self.client.get(self.url).json()['results'], [])
+
+        self.client.post(reverse('task-bulk'), {
+            'update': [{'id': self.task.pk, 'status': 'pending'}],
+        }, format='json')
+        self.assertEqual(len(self.client.get(self.url).json()['results']), 1)
+
+    def test_version_bumped_only_after_commit(self):
+        version = get_task_version(self.user.pk)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.task.delete()
+        # Antes do commit, uma leitura concorrente ainda vê as linhas antigas
+        self.assertEqual(get_task_version(self.user.pk), version)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_task_version(self.user.pk), version)
+
+    def test_cache_is_per_user(self):
+        self.client.get(self.url)
+        other = User.objects.create_user(username='bruno', password='senha-forte-123')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(self.url).json()['results'], [])
+
+
+class TaskSearchTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.title_match = self.create_task(title='Relatório mensal', description='Enviar ao financeiro')
+        self.description_match = self.create_task(title='Reunião', description='Revisar o relatório')
+        self.create_task(title='Academia', description='Treino de pernas')
+        other = User.objects.create_user(username='bruno', password='senha-forte-123')
+        self.create_task(user=other, title='Relatório do Bruno')
+
+    def search(self, term):
+        return self.client.get(reverse('task-search'), {'q': term})
+
+    def test_ranked_results(self):
+        response = self.search('relatório')
+        self.assertEqual(response.status_code, 200)
+        ids = [task['id'] for task in response.json()['results']]
+        self.assertEqual(ids, [self.title_match.pk, self.description_match.pk])
+
+    def test_all_words_must_match(self):
+        ids = [task['id'] for task in self.search('relatório financeiro').json()['results']]
+        self.assertEqual(ids, [self.title_match.pk])
+
+    def test_empty_term_rejected(self):
+        self.assertEqual(self.search('  ').status_code, 400)
+
+    def test_admin_search(self):
+        model_admin = TaskAdmin(Task, admin.site)
+        queryset, _ = model_admin.get_search_results(None, Task.objects.all(), 'treino')
+        self.assertEqual([task.title for task in queryset], ['Academia'])
+        queryset, _ = model_admin.get_search_results(None, Task.objects.all(), 'bru')
+        self.assertEqual([task.title for task in queryset], ['Relatório do Bruno'])
+
+    def test_admin_search_sql_on_postgresql(self):
+        postgresql = postgresql_connection(self)
+        model_admin = TaskAdmin(Task, admin.site)
+        queryset, _ = model_admin.get_search_results(None, Task.objects.using('postgresql'), 'bru')
+        sql, _ = queryset.query.get_compiler(connection=postgresql).as_sql()
+        self.assertIn('WHERE ("tasks"."search_vector" @@ (websearch_to_tsquery(', sql)
+        self.assertNotIn('SELECT U0', sql)
+        # O OR só usa colunas de tasks (o prefixo do username vira uma lista de ids)
+        where = sql.split(' WHERE ', 1)[1]
+        self.assertNotIn('auth_user', where)
+        self.assertIn('OR "tasks"."user_id" IN (%s)', where)
+
+        # Como subconsulta, a coluna acompanha o alias da tabela interna
+        matches = Task.objects.using('postgresql').search('treino').values('pk')
+        queryset = Task.objects.using('postgresql').filter(pk__in=matches)
+        sql, _ = queryset.query.get_compiler(connection=postgresql).as_sql()
+        self.assertIn('FROM "tasks" U0 WHERE U0."search_vector" @@', sql)
+        self.assertNotIn('"tasks"."search_vector"', sql)
+
+
+@override_settings(TASK_SYNC_SAFETY_WINDOW=0)
+class TaskSyncTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tasks = [self.create_task(title=f'Tarefa {i}') for i in range(5)]
+
+    def sync(self, since=None, **params):
+        if since:
+            params['since'] = since
+        response = self.client.get(reverse('task-sync'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_initial_sync_pages_through_all_tasks(self):
+        ids, cursor, has_more = [], None, True
+        while has_more:
+            data = self.sync(cursor, page_size=2)
+            ids.extend(task['id'] for task in data['changed'])
+            self.assertEqual(data['deleted'], [])
+            cursor, has_more = data['cursor'], data['has_more']
+        self.assertEqual(ids, [task.pk for task in self.tasks])
+        self.assertEqual(self.sync(cursor)['changed'], [])
+
+    def test_returns_only_changes_and_tombstones(self):
+        cursor = self.sync()['cursor']
+        changed = self.tasks[1]
+        self.client.put(reverse('task-detail', args=[changed.pk]), {'title': 'Alterada'}, format='json')
+        self.client.post(reverse('task-list'), {'title': 'Nova'}, format='json')
+        self.client.delete(reverse('task-detail', args=[self.tasks[2].pk]))
+        self.client.post(reverse('task-bulk'), {'delete': [self.tasks[3].pk]}, format='json')
+
+        data = self.sync(cursor)
+        self.assertEqual([task['title'] for task in data['changed']], ['Alterada', 'Nova'])
+        self.assertEqual(data['deleted'], [self.tasks[2].pk, self.tasks[3].pk])
+        data = self.sync(data['cursor'])
+        self.assertEqual((data['changed'], data['deleted']), ([], []))
+
+    def test_recent_changes_held_back(self):
+        with self.settings(TASK_SYNC_SAFETY_WINDOW=60):
+            data = self.sync()
+        self.assertEqual(data['changed'], [])
+        self.assertEqual(len(self.sync(data['cursor'])['changed']), 5)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('task-sync'), {'since': 'invalido'})
+        self.assertEqual(response.status_code, 404)
+
+
+class MetricsTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        registry.reset()
+        self.create_task()
+
+    def metrics(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_records_latency_queries_and_size(self):
+        self.client.get(reverse('my-tasks'))
+        self.client.get(reverse('my-tasks'))
+        text = self.metrics()
+        labels = 'route="/api/my-tasks/",method="GET"'
+        self.assertIn(f'http_requests_total{{{labels},status="200"}} 2', text)
+        self.assertIn(f'http_request_duration_seconds_count{{{labels}}} 2', text)
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2', text)
+        self.assertIn(f'http_response_size_bytes_count{{{labels}}} 2', text)
+        # Primeira requisição: próximo vencimento do ETag + listagem; a segunda vem do cache
+        self.assertIn(f'db_queries_per_request_bucket{{{labels},le="0"}} 1', text)
+        self.assertIn(f'db_queries_per_request_sum{{{labels}}} 2', text)
+
+    def test_counts_async_view_queries_and_auth_failures(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.get(reverse('async-task-list'), HTTP_AUTHORIZATION=f'Bearer {token}')
+        APIClient().get(reverse('my-tasks'))
+        text = self.metrics()
+        # Usuário do JWT + listagem, executadas fora da thread da requisição
+        self.assertIn('db_queries_per_request_sum{route="/api/async/tasks/",method="GET"} 2', text)
+        self.assertIn('http_auth_failures_total{route="/api/my-tasks/",method="GET"} 1', text)
+
+    def test_aggregates_other_workers(self):
+        with tempfile.TemporaryDirectory() as directory, self.settings(METRICS_MULTIPROC_DIR=directory):
+            labels = [['route', '/api/my-tasks/'], ['method', 'GET'], ['status', '200']]
+            with open(os.path.join(directory, '1.json'), 'w') as target:
+                json.dump([['http_requests_total', labels, '', 5]], target)
+            self.client.get(reverse('my-tasks'))
+            registry.flush(directory)
+            self.assertIn('http_requests_total{route="/api/my-tasks/",method="GET",status="200"} 6', self.metrics())
+
+    def test_token_required_when_configured(self):
+        with self.settings(METRICS_TOKEN='segredo'):
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+            response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer segredo')
+            self.assertEqual(response.status_code, 200)
+
+
+class ReplicaRoutingTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(_replica_health.clear)
+        self.state = RoutingState()
+        self.addCleanup(routing_state.reset, routing_state.set(self.state))
+
+    def stats_view_state(self):
+        """Chama TaskStatsView direto e devolve se ela liberou a réplica"""
+        request = APIRequestFactory().get(reverse('task-stats'))
+        force_authenticate(request, self.user)
+        self.assertEqual(TaskStatsView.as_view()(request).status_code, 200)
+        return self.state.use_replica
+
+    def test_reads_go_to_replica_only_when_allowed(self):
+        self.assertEqual(Task.objects.all().db, DEFAULT_DB_ALIAS)
+        self.state.use_replica = True
+        self.assertIn(Task.objects.all().db, settings.DATABASE_REPLICAS)
+
+    def test_reads_after_write_use_primary(self):
+        self.state.use_replica = True
+        self.create_task()
+        self.assertTrue(self.state.wrote)
+        self.assertEqual(Task.objects.all().db, DEFAULT_DB_ALIAS)
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        self.state.use_replica = True
+        for alias in settings.DATABASE_REPLICAS:
+            _replica_health[alias] = (False, time.monotonic())
+        self.assertEqual(Task.objects.all().db, DEFAULT_DB_ALIAS)
+
+    def test_write_pins_user_to_primary(self):
+        self.assertTrue(self.stats_view_state())
+        self.client.get(reverse('task-list'))
+        self.assertFalse(is_pinned_to_primary(self.user.pk))
+
+        response = self.client.post(reverse('task-list'), {'title': 'Nova'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(is_pinned_to_primary(self.user.pk))
+        self.assertFalse(self.stats_view_state())
+        # Só as leituras de quem escreveu ficam no primário
+        other = User.objects.create_user(username='bia', password='senha-forte-123')
+        self.assertFalse(is_pinned_to_primary(other.pk))
+
+
+class LaggingReplicaTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(_replica_health.clear)
+        self.task = self.create_task(status='pending')
+        # Passado DB_PRIMARY_STICKY_SECONDS da criação, as leituras voltam às réplicas
+        cache.clear()
+
+    def freeze_replicas(self):
+        """Troca as réplicas por uma cópia do banco neste momento, que não recebe as escritas seguintes"""
+        replica = SQLiteDatabaseWrapper({**connection.settings_dict, 'NAME': ':memory:'}, alias='lagging')
+        replica.ensure_connection()
+        self.addCleanup(replica.close)
+        dump = '\n'.join(connection.connection.iterdump())
+        replica.connection.executescript(f'PRAGMA foreign_keys = OFF;\n{dump}')
+        for alias in settings.DATABASE_REPLICAS:
+            connections[alias] = replica
+
+    def test_cache_is_not_filled_from_lagging_replica_after_write(self):
+        self.freeze_replicas()
+        url = reverse('task-pending')
+        self.assertEqual(len(self.client.get(url).json()['results']), 1)
+        self.assertFalse(is_pinned_to_primary(self.user.pk))
+
+        # Escrita fora de uma requisição da API (como o admin ou o archive_tasks)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.status = 'completed'
+            self.task.save()
+        self.assertTrue(is_pinned_to_primary(self.user.pk))
+        self.assertEqual(self.client.get(url).json()['results'], [])
+
+
+class TaskArchiveTests(TaskAPITestCase):
+
+    def create_closed(self, days_ago, **kwargs):
+        kwargs.setdefault('status', 'completed')
+        task = self.create_task(completed_at=timezone.now(), **kwargs)
+        Task.objects.filter(pk=task.pk).update(updated_at=timezone.now() - timedelta(days=days_ago))
+        return task
+
+    def test_command_archives_old_closed_tasks_in_batches(self):
+        old = [self.create_closed(200, title=f'Antiga {i}') for i in range(3)]
+        old.append(self.create_closed(200, title='Cancelada', status='cancelled'))
+        recent = self.create_closed(10)
+        open_task = self.create_task()
+        Task.objects.filter(pk=open_task.pk).update(updated_at=timezone.now() - timedelta(days=400))
+
+        # Interrompido depois de um lote e retomado
+        call_command('archive_tasks', '--batch-size', '3', '--max-batches', '1', stdout=io.StringIO())
+        self.assertEqual(ArchivedTask.objects.count(), 3)
+        call_command('archive_tasks', '--batch-size', '3', stdout=io.StringIO())
+
+        self.assertEqual(sorted(ArchivedTask.objects.values_list('id', flat=True)), sorted(t.pk for t in old))
+        self.assertEqual(set(Task.objects.values_list('id', flat=True)), {recent.pk, open_task.pk})
+        archived = ArchivedTask.objects.get(pk=old[0].pk)
+        self.assertEqual((archived.title, archived.status, archived.user), ('Antiga 0', 'completed', self.user))
+        self.assertEqual(archived.created_at, old[0].created_at)
+
+    def test_completed_includes_archived_only_when_asked(self):
+        first = self.create_closed(200, title='Arquivada')
+        second = self.create_closed(200, title='Ativa')
+        self.create_closed(200, title='Arquivada 2')
+        Task.objects.filter(pk=second.pk).update(updated_at=timezone.now())
+        call_command('archive_tasks', stdout=io.StringIO())
+
+        url = reverse('task-completed')
+        self.assertEqual([t['title'] for t in self.client.get(url).data['results']], ['Ativa'])
+
+        data = self.client.get(url, {'include_archived': 'true', 'page_size': 2}).data
+        self.assertEqual([t['title'] for t in data['results']], ['Arquivada 2', 'Ativa'])
+        data = self.client.get(data['next']).data
+        self.assertEqual([t['id'] for t in data['results']], [first.pk])
+        self.assertIsNone(data['next'])
+
+    def test_stats_include_archived(self):
+        self.create_closed(200, priority='high')
+        self.create_task(priority='high')
+        call_command('archive_tasks', stdout=io.StringIO())
+
+        stats = self.client.get(reverse('task-stats')).data
+        self.assertEqual((stats['total'], stats['completed']), (1, 0))
+        stats = self.client.get(reverse('task-stats'), {'include_archived': 'true'}).data
+        self.assertEqual((stats['total'], stats['completed'], stats['by_priority']['high']), (2, 1, 2))
+
+
+class SparseFieldsetTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            self.create_task(title=f'Tarefa {i}', description='Texto longo', priority=['low', 'high', 'medium'][i])
+
+    def test_fields_restrict_output_and_columns(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('task-list'), {'fields': 'title,id,is_overdue'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data['results'][0]), ['id', 'title', 'is_overdue'])
+        sql = captured.captured_queries[-1]['sql']
+        self.assertNotIn('description', sql)
+        self.assertNotIn('auth_user', sql)
+
+    def test_fields_with_ordering_and_cursor(self):
+        url = reverse('my-tasks')
+        data = self.client.get(url, {'fields': 'title', 'ordering': '-priority', 'page_size': 2}).data
+        self.assertEqual(data['results'], [{'title': 'Tarefa 1'}, {'title': 'Tarefa 2'}])
+        data = self.client.get(data['next']).data
+        self.assertEqual(data['results'], [{'title': 'Tarefa 0'}])
+
+    def test_search_fields(self):
+        response = self.client.get(reverse('task-search'), {'q': 'tarefa', 'fields': 'id,status'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'status'})
+
+    def test_unknown_field(self):
+        response = self.client.get(reverse('task-list'), {'fields': 'title,senha'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.data)
+
+
+@skipUnless(renderers.orjson, 'orjson não instalado')
+class ORJSONRendererTests(TaskAPITestCase):
+
+    def test_same_bytes_as_json_renderer(self):
+        self.create_task(title='Ação\u2028linha', due_date=timezone.now())
+        data = TaskSerializer(Task.objects.all(), many=True).data
+        self.assertEqual(renderers.ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_unsupported_values_fall_back_to_json_renderer(self):
+        data = {'id': 2 ** 70}
+        self.assertEqual(renderers.ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_falls_back_to_json_renderer(self):
+        data = {'a': [1, 2]}
+        rendered = renderers.ORJSONRenderer().render(data, 'application/json; indent=2')
+        self.assertEqual(rendered, JSONRenderer().render(data, 'application/json; indent=2'))
+
+    def test_invalid_json_body(self):
+        response = self.client.post(reverse('task-bulk'), '{"create": [', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+@skipUnless(renderers.msgpack, 'msgpack não instalado')
+class MessagePackTests(TaskAPITestCase):
+
+    def test_negotiated_by_accept(self):
+        self.create_task(title='Tarefa')
+        response = self.client.get(reverse('task-list'), HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        data = renderers.msgpack.unpackb(response.content)
+        self.assertEqual(data['results'][0]['title'], 'Tarefa')
+
+    def test_bulk_body(self):
+        body = renderers.msgpack.packb({'create': [{'title': 'Nova'}]})
+        response = self.client.post(reverse('task-bulk'), body, content_type='application/msgpack')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Task.objects.filter(title='Nova').exists())
+
+
+class TokenRevocationTests(TaskAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.refresh = RefreshToken.for_user(self.user)
+        self.access = self.refresh.access_token
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+
+    def test_logout_revokes_access_and_refresh_tokens(self):
+        self.assertEqual(self.client.get(reverse('task-list')).status_code, 200)
+        response = self.client.post(reverse('logout'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(RevokedToken.objects.filter(user=self.user).count(), 2)
+
+        self.assertEqual(self.client.get(reverse('task-list')).status_code, 401)
+        self.assertEqual(self.client.get(reverse('async-task-list')).status_code, 401)
+        response = APIClient().post(reverse('token_refresh'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_logout_rejects_refresh_token_of_other_user(self):
+        other = User.objects.create_user(username='bia', password='senha-forte-123')
+        response = self.client.post(reverse('logout'), {'refresh': str(RefreshToken.for_user(other))}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(RevokedToken.objects.exists())
+
+    def test_revocations_from_other_workers_synced_per_interval(self):
+        # Revogação gravada por outro processo: só aparece na próxima sincronização
+        RevokedToken.objects.create(jti=self.access['jti'], expires_at=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(self.client.get(reverse('protected')).status_code, 200)
+        with self.settings(JWT_REVOCATION_SYNC_INTERVAL=0):
+            self.assertEqual(self.client.get(reverse('protected')).status_code, 401)
+
+    def test_expired_revocations_pruned(self):
+        revoked_tokens.add('expirado', time.time() - 1)
+        self.assertNotIn('expirado', revoked_tokens)
+        RevokedToken.objects.create(jti='expirado', expires_at=timezone.now() - timedelta(seconds=1))
+        with self.settings(JWT_REVOCATION_SYNC_INTERVAL=0):
+            revoked_tokens.sync()
+            self.client.post(reverse('logout'))
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), [self.access['jti']])
+
+
+class RateLimitTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+
+    def register(self, username):
+        return APIClient().post(reverse('register'), {
+            'username': username, 'email': f'{username}@exemplo.com', 'password': 'senha-forte-123',
+        }, format='json')
+
+    @override_settings(RATE_LIMITS={'register': {'ip': (2, 3600)}})
+    def test_register_limited_per_ip(self):
+        self.assertEqual(self.register('ana').status_code, 201)
+        self.assertEqual(self.register('bia').status_code, 201)
+        response = self.register('carla')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertFalse(User.objects.filter(username='carla').exists())
+
+        text = self.client.get('/metrics').content.decode()
+        self.assertIn('rate_limit_requests_total{route="register",scope="ip"} 3', text)
+        self.assertIn('rate_limit_rejections_total{route="register",scope="ip"} 1', text)
+
+    def test_sliding_window_weights_previous_window(self):
+        # Metade da janela anterior ainda conta: 10 * 0.5 + 1 > 5
+        self.assertEqual(_wait(previous=10, current=1, limit=5, window=60, elapsed=30), 30)
+        # Perto do fim da janela atual, quase nada da anterior: 10 * 0.1 + 1 <= 5
+        self.assertEqual(_wait(previous=10, current=1, limit=5, window=60, elapsed=54), 0)
@@ -1,13 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
-    ProtectedView, RegisterView, UserListView,
-    TaskViewSet, TaskListView, TaskDetailView, TaskStatsView
-)
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
+    LogoutView, ProtectedView, RegisterView, UserListView,
+    TaskViewSet, TaskListView, TaskDetailView, TaskStatsView,
+    TaskExportView
 )
+from . import async_views
+from .async_views import login_view
+from rest_framework_simplejwt.views import TokenRefreshView
 
 # Router para ViewSets
 router = DefaultRouter()
@@ -16,8 +16,9 @@ router.register(r'tasks', TaskViewSet, basename='task')
 urlpatterns = [
     # Autenticação
     path('register/', RegisterView.as_view(), name='register'),
-    path('login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('login/', login_view, name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('logout/', LogoutView.as_view(), name='logout'),
     
     # Usuários
     path('protected/', ProtectedView.as_view(), name='protected'),
@@ -29,5 +30,15 @@ urlpatterns = [
     # Tarefas - Views customizadas alternativas
     path('my-tasks/', TaskListView.as_view(), name='my-tasks'),
     path('my-tasks/<int:pk>/', TaskDetailView.as_view(), name='task-detail'),
+    path('my-tasks/export/', TaskExportView.as_view(), name='task-export'),
     path('task-stats/', TaskStatsView.as_view(), name='task-stats'),
+    
+    # Tarefas - leitura com views async nativas (para servir via ASGI)
+    path('async/tasks/', async_views.task_list, name='async-task-list'),
+    path('async/tasks/completed/', async_views.completed_tasks, name='async-task-completed'),
+    path('async/tasks/pending/', async_views.pending_tasks, name='async-task-pending'),
+    path('async/tasks/overdue/', async_views.overdue_tasks, name='async-task-overdue'),
+    path('async/tasks/by_priority/', async_views.tasks_by_priority, name='async-task-by-priority'),
+    path('async/tasks/<int:pk>/', async_views.task_detail, name='async-task-detail'),
+    path('async/task-stats/', async_views.task_stats, name='async-task-stats'),
 ]
\ No newline at end of file
@@ -1,10 +1,15 @@
+import json
+import zlib
+
 from rest_framework import generics, status
+from rest_framework.exceptions import Throttled
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import authenticate
 from .serializers import (
     RegisterSerializer, TaskSerializer, TaskCreateSerializer, 
-    TaskUpdateSerializer, TaskStatusSerializer
+    TaskUpdateSerializer, TaskStatusSerializer, TaskBulkSerializer,
+    FastTaskSerializer, LogoutSerializer
 )
 from django.contrib.auth.models import User
 from rest_framework.views import APIView
@@ -12,13 +17,28 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework import serializers
 from rest_framework.decorators import action
 from rest_framework.viewsets import ModelViewSet
+from django.conf import settings
 from django.db.models import Q
-from .models import Task
+from django.http import StreamingHttpResponse
+from .models import ArchivedTask, Task
+from .export import csv_lines, ndjson_lines
+from .cache import get_cached_response, get_task_stats, get_task_version
+from .conditional import TaskConditionalMixin, build_etag
+from .db_router import ReplicaReadMixin
+from .pagination import TaskCursorPagination, UserCursorPagination
+from .ratelimit import check_rate_limit
+from .revocation import revoke_token
+from .sync import TaskSync
 
 class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
 
     def create(self, request, *args, **kwargs):
+        # Antes da validação e do hash da senha
+        username = request.data.get('username') if isinstance(request.data, dict) else None
+        wait = check_rate_limit('register', request, username)
+        if wait:
+            raise Throttled(wait)
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
@@ -38,6 +58,20 @@ class LoginView(generics.GenericAPIView):
             return Response({"token": token.key})
         return Response({"error": "Invalid credentials"}, status=status.HTTP_400_BAD_REQUEST)
     
+class LogoutView(APIView):
+    """Revoga o access token da requisição e, se enviado, o refresh token"""
+    
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        if request.auth is not None:
+            revoke_token(request.auth, request.user)
+        if 'refresh' in serializer.validated_data:
+            revoke_token(serializer.validated_data['refresh'], request.user)
+        return Response({"message": "Logout realizado com sucesso"})
+
 class ProtectedView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -50,23 +84,53 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'email', 'date_joined']
 
-class UserListView(APIView):
+class UserListView(ReplicaReadMixin, APIView):
+    """Diretório de usuários paginado, com busca por prefixo de username/e-mail"""
+    
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        users = User.objects.all()
-        serializer = UserSerializer(users, many=True)
-        return Response(serializer.data)
+        # Busca só as colunas que o UserSerializer usa
+        users = User.objects.only(*UserSerializer.Meta.fields)
+        
+        search = request.query_params.get('search', '').strip()
+        if search:
+            users = users.filter(Q(username__istartswith=search) | Q(email__istartswith=search))
+        
+        paginator = UserCursorPagination()
+        page = paginator.paginate_queryset(users, request, view=self)
+        serializer = UserSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 # Views para Tasks
-class TaskViewSet(ModelViewSet):
+def paginated_task_data(paginator, request, view, queryset, archived=None):
+    """
+    Página de tarefas serializada, só com os campos pedidos em `fields`: a consulta
+    busca apenas as colunas desses campos e as da ordenação da paginação.
+    """
+    fields = FastTaskSerializer.parse_fields(request)
+    ordering = [name.lstrip('-') for name in paginator.get_ordering(request, queryset, view)]
+    if archived is None:
+        page = paginator.paginate_queryset(FastTaskSerializer.values(queryset, fields, ordering), request, view=view)
+    else:
+        querysets = [FastTaskSerializer.values(tasks, fields, ordering) for tasks in (queryset, archived)]
+        page = paginator.paginate_querysets(querysets, request, view=view)
+    return paginator.get_paginated_data(FastTaskSerializer(page, fields).data)
+
+def include_archived(request):
+    """Se a requisição pediu as tarefas arquivadas (`?include_archived=true`)"""
+    return request.query_params.get('include_archived', '').lower() in ('1', 'true')
+
+class TaskViewSet(TaskConditionalMixin, ReplicaReadMixin, ModelViewSet):
     """ViewSet completo para gerenciar tarefas"""
     
     permission_classes = [IsAuthenticated]
+    # Leituras que podem ir às réplicas (a sincronização depende do primário)
+    replica_actions = {'list', 'retrieve', 'completed', 'pending', 'overdue', 'by_priority', 'search'}
     
     def get_queryset(self):
         """Retorna apenas as tarefas do usuário logado"""
-        return Task.objects.filter(user=self.request.user)
+        return Task.objects.filter(user=self.request.user).select_related('user')
     
     def get_serializer_class(self):
         """Retorna o serializer apropriado baseado na action"""
@@ -80,6 +144,28 @@ class TaskViewSet(ModelViewSet):
         """Associa a tarefa ao usuário logado"""
         serializer.save(user=self.request.user)
     
+    def get_etag(self, request):
+        # A resposta da sincronização muda com o tempo (janela de segurança), não só com escritas
+        if self.action == 'sync':
+            return None
+        return super().get_etag(request)
+    
+    def perform_destroy(self, instance):
+        """Remove a tarefa registrando o tombstone para a sincronização"""
+        Task.objects.filter(pk=instance.pk).delete_with_tombstones()
+    
+    def paginated_response(self, queryset, archived=None):
+        """
+        Serializa uma página de tarefas no formato paginado, com cache por usuário.
+        `archived` (tarefas arquivadas) entra na mesma paginação, se informado.
+        """
+        def build():
+            return paginated_task_data(self.paginator, self.request, self, queryset, archived)
+        return Response(get_cached_response(self.request, build))
+    
+    def list(self, request, *args, **kwargs):
+        return self.paginated_response(self.get_queryset())
+    
     @action(detail=True, methods=['patch'])
     def mark_completed(self, request, pk=None):
         """Action para marcar tarefa como concluída"""
@@ -88,47 +174,75 @@ class TaskViewSet(ModelViewSet):
         serializer = TaskSerializer(task)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Cria, atualiza e remove tarefas em lote numa única transação"""
+        serializer = TaskBulkSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        result = serializer.save()
+        return Response({
+            'created': TaskSerializer(result['created'], many=True).data,
+            'updated': TaskSerializer(result['updated'], many=True).data,
+            'deleted': result['deleted'],
+        })
+    
+    @action(detail=False, methods=['get'])
+    def sync(self, request):
+        """Tarefas criadas/alteradas e ids removidos desde o cursor `since`"""
+        limit = self.paginator.get_page_size(request)
+        changes = TaskSync(request.user, limit).get_changes(request.query_params.get('since'))
+        return Response(changes)
+    
     @action(detail=False, methods=['get'])
     def completed(self, request):
-        """Retorna apenas tarefas concluídas"""
+        """Retorna apenas tarefas concluídas; `include_archived` inclui as arquivadas"""
         completed_tasks = self.get_queryset().filter(status='completed')
-        serializer = TaskSerializer(completed_tasks, many=True)
-        return Response(serializer.data)
+        if include_archived(request):
+            archived = ArchivedTask.objects.filter(user=request.user, status='completed')
+            return self.paginated_response(completed_tasks, archived)
+        return self.paginated_response(completed_tasks)
     
     @action(detail=False, methods=['get'])
     def pending(self, request):
         """Retorna apenas tarefas pendentes"""
         pending_tasks = self.get_queryset().filter(status='pending')
-        serializer = TaskSerializer(pending_tasks, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(pending_tasks)
     
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Retorna tarefas atrasadas"""
-        overdue_tasks = []
-        for task in self.get_queryset().filter(status__in=['pending', 'in_progress']):
-            if task.is_overdue():
-                overdue_tasks.append(task)
-        serializer = TaskSerializer(overdue_tasks, many=True)
-        return Response(serializer.data)
+        overdue_tasks = self.get_queryset().overdue()
+        return self.paginated_response(overdue_tasks)
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Busca textual em título e descrição, com as tarefas mais relevantes primeiro"""
+        term = request.query_params.get('q', '').strip()
+        if not term:
+            return Response({"error": "Informe o termo de busca em q"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        def build():
+            # Resultados por relevância: só a primeira página, sem cursor
+            limit = self.paginator.get_page_size(request)
+            fields = FastTaskSerializer.parse_fields(request)
+            tasks = FastTaskSerializer.values(self.get_queryset().search(term), fields)[:limit]
+            return {'results': FastTaskSerializer(list(tasks), fields).data}
+        return Response(get_cached_response(request, build))
     
     @action(detail=False, methods=['get'])
     def by_priority(self, request):
         """Retorna tarefas agrupadas por prioridade"""
         priority = request.query_params.get('priority', None)
         if priority:
-            tasks = self.get_queryset().filter(priority=priority)
+            tasks = self.get_queryset().with_code('priority', priority)
         else:
             tasks = self.get_queryset()
-        serializer = TaskSerializer(tasks, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(tasks)
 
-class TaskListView(APIView):
-    """View simples para listar tarefas do usuário"""
+class TaskFilterMixin:
+    """Filtros opcionais de status e prioridade das listagens de tarefas"""
     
-    permission_classes = [IsAuthenticated]
-    
-    def get(self, request):
+    def get_tasks(self, request):
         tasks = Task.objects.filter(user=request.user)
         
         # Filtros opcionais
@@ -136,13 +250,22 @@ class TaskListView(APIView):
         priority_filter = request.query_params.get('priority', None)
         
         if status_filter:
-            tasks = tasks.filter(status=status_filter)
+            tasks = tasks.with_code('status', status_filter)
         
         if priority_filter:
-            tasks = tasks.filter(priority=priority_filter)
+            tasks = tasks.with_code('priority', priority_filter)
         
-        serializer = TaskSerializer(tasks, many=True)
-        return Response(serializer.data)
+        return tasks
+
+class TaskListView(TaskConditionalMixin, TaskFilterMixin, APIView):
+    """View simples para listar tarefas do usuário"""
+    
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        def build():
+            return paginated_task_data(TaskCursorPagination(), request, self, self.get_tasks(request))
+        return Response(get_cached_response(request, build))
     
     def post(self, request):
         serializer = TaskCreateSerializer(data=request.data, context={'request': request})
@@ -151,7 +274,30 @@ class TaskListView(APIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class TaskDetailView(APIView):
+class TaskExportView(TaskFilterMixin, APIView):
+    """Exporta todas as tarefas do usuário em NDJSON ou CSV, via streaming"""
+    
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        output = request.query_params.get('output', 'ndjson')
+        if output not in ('ndjson', 'csv'):
+            return Response({"error": "Formato inválido, use ndjson ou csv"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # iterator() usa cursor no servidor: só um bloco de tarefas fica em memória
+        tasks = FastTaskSerializer.values(self.get_tasks(request))
+        rows = FastTaskSerializer(
+            tasks.iterator(chunk_size=settings.TASK_EXPORT_CHUNK_SIZE)
+        ).iterate()
+        
+        if output == 'csv':
+            response = StreamingHttpResponse(csv_lines(rows, FastTaskSerializer.fields), content_type='text/csv')
+        else:
+            response = StreamingHttpResponse(ndjson_lines(rows), content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="tasks.{output}"'
+        return response
+
+class TaskDetailView(TaskConditionalMixin, APIView):
     """View para operações detalhadas com uma tarefa específica"""
     
     permission_classes = [IsAuthenticated]
@@ -186,32 +332,26 @@ class TaskDetailView(APIView):
         if not task:
             return Response({"error": "Tarefa não encontrada"}, status=status.HTTP_404_NOT_FOUND)
         
-        task.delete()
+        Task.objects.filter(pk=task.pk).delete_with_tombstones()
         return Response({"message": "Tarefa deletada com sucesso"}, status=status.HTTP_204_NO_CONTENT)
 
-class TaskStatsView(APIView):
+class TaskStatsView(TaskConditionalMixin, ReplicaReadMixin, APIView):
     """View para estatísticas das tarefas do usuário"""
     
     permission_classes = [IsAuthenticated]
+    stats = None
+    
+    def get_stats(self, request):
+        """Estatísticas da requisição, buscadas uma vez e usadas no ETag e na resposta"""
+        if self.stats is None:
+            self.stats = get_task_stats(request.user, include_archived(request))
+        return self.stats
+    
+    def get_etag(self, request):
+        # As estatísticas já ficam em cache; o ETag sai do próprio conteúdo
+        version = get_task_version(request.user.pk)
+        marker = zlib.crc32(json.dumps(self.get_stats(request), sort_keys=True).encode())
+        return build_etag(request, version, marker)
     
     def get(self, request):
-        user_tasks = Task.objects.filter(user=request.user)
-        
-        stats = {
-            'total': user_tasks.count(),
-            'completed': user_tasks.filter(status='completed').count(),
-            'pending': user_tasks.filter(status='pending').count(),
-            'in_progress': user_tasks.filter(status='in_progress').count(),
-            'cancelled': user_tasks.filter(status='cancelled').count(),
-            'overdue': sum(1 for task in user_tasks.filter(status__in=['pending', 'in_progress']) if task.is_overdue()),
-            'by_priority': {
-                'low': user_tasks.filter(priority='low').count(),
-                'medium': user_tasks.filter(priority='medium').count(),
-                'high': user_tasks.filter(priority='high').count(),
-                'urgent': user_tasks.filter(priority='urgent').count(),
-            }
-        }
-        
-        return Response(stats)
-
-
+        return Response(self.get_stats(request))
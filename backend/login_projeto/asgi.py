@@ -3,6 +3,11 @@ ASGI config for login_projeto project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Views assíncronas (como o login em accounts.async_views) rodam direto no event
+loop quando servidas por aqui, por exemplo com:
+
+    uvicorn login_projeto.asgi:application
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -10,9 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 import os
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -48,11 +49,73 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'accounts.pagination.TaskCursorPagination',
+    'PAGE_SIZE': config('PAGE_SIZE', default=50, cast=int),
+    # Proxies reversos à frente da aplicação: define quantos endereços de
+    # X-Forwarded-For são confiáveis para identificar o cliente (limites por IP)
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+    # Escolhidos pelo Accept/Content-Type; orjson e msgpack são opcionais (ver accounts/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'accounts.renderers.ORJSONRenderer' if find_spec('orjson') else 'rest_framework.renderers.JSONRenderer',
+        *(['accounts.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'accounts.renderers.ORJSONParser' if find_spec('orjson') else 'rest_framework.parsers.JSONParser',
+        *(['accounts.renderers.MessagePackParser'] if find_spec('msgpack') else []),
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+SIMPLE_JWT = {
+    # Recusa refresh tokens revogados no logout (ver accounts/revocation.py)
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.RevocableTokenRefreshSerializer',
+}
+
+# Número máximo de itens (criações + atualizações + remoções) em /tasks/bulk/
+TASK_BULK_MAX_ITEMS = config('TASK_BULK_MAX_ITEMS', default=1000, cast=int)
+
+# Tarefas lidas do banco por vez durante a exportação em streaming
+TASK_EXPORT_CHUNK_SIZE = config('TASK_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Cache em memória dos usuários autenticados por JWT (por processo)
+AUTH_USER_CACHE_MAX_SIZE = config('AUTH_USER_CACHE_MAX_SIZE', default=10000, cast=int)
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=60, cast=int)
+
+# Intervalo (em segundos) com que cada worker busca os JWT revogados por outros
+# workers; no worker que revogou o efeito é imediato
+JWT_REVOCATION_SYNC_INTERVAL = config('JWT_REVOCATION_SYNC_INTERVAL', default=1.0, cast=float)
+
+# Limites de taxa por rota e escopo (`ip`, `username`): (requisições, janela em
+# segundos), em janela deslizante com contadores no cache; acima deles a rota
+# responde 429 antes de qualquer hash de senha. Com vários workers, use um cache
+# compartilhado (CACHE_BACKEND) para o limite valer no servidor todo.
+RATE_LIMITS = {
+    'login': {
+        'ip': (config('RATE_LIMIT_LOGIN_IP', default=30, cast=int), 60),
+        'username': (config('RATE_LIMIT_LOGIN_USERNAME', default=10, cast=int), 300),
+    },
+    'register': {
+        'ip': (config('RATE_LIMIT_REGISTER_IP', default=10, cast=int), 3600),
+    },
+}
+
+# Threads dedicadas à verificação de senha do login e tamanho máximo da fila;
+# acima disso o login responde 503 imediatamente
+LOGIN_EXECUTOR_WORKERS = config('LOGIN_EXECUTOR_WORKERS', default=4, cast=int)
+LOGIN_EXECUTOR_QUEUE_SIZE = config('LOGIN_EXECUTOR_QUEUE_SIZE', default=16, cast=int)
+
+# Limite para o parâmetro ?page_size= das listas paginadas
+PAGINATION_MAX_PAGE_SIZE = config('PAGINATION_MAX_PAGE_SIZE', default=200, cast=int)
+
 MIDDLEWARE = [
+    # Primeiro da lista, para medir a requisição inteira
+    'accounts.metrics.metrics_middleware',
+    # Antes de qualquer leitura do banco
+    'accounts.db_router.replica_routing_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -88,17 +151,81 @@ WSGI_APPLICATION = 'login_projeto.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+if config('DB_ENGINE', default='postgresql') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+    # Réplicas: arquivos SQLite; por padrão o próprio banco, por uma segunda conexão
+    DB_REPLICAS = config('DB_REPLICAS', default=str(BASE_DIR / 'db.sqlite3'), cast=Csv())
+    REPLICA_SETTINGS = [{'NAME': name} for name in DB_REPLICAS]
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='postgres'),
+            'USER': config('DB_USER', default='postgres'),
+            'PASSWORD': config('DB_PASSWORD', default='12345'),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default=5432),
+            # Conexões persistentes, verificadas antes de serem reaproveitadas
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+    # Réplicas de leitura: hosts com as mesmas credenciais do primário
+    DB_REPLICAS = config('DB_REPLICAS', default='', cast=Csv())
+    REPLICA_SETTINGS = [{'HOST': host} for host in DB_REPLICAS]
+
+for index, replica in enumerate(REPLICA_SETTINGS, start=1):
+    # Nos testes a réplica usa o banco de teste do primário
+    DATABASES[f'replica{index}'] = {**DATABASES['default'], **replica, 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['accounts.db_router.ReplicaRouter']
+
+# Depois de uma escrita, as leituras do usuário vão ao primário por este tempo
+# (em segundos), que deve ser maior que o atraso de replicação
+DB_PRIMARY_STICKY_SECONDS = config('DB_PRIMARY_STICKY_SECONDS', default=5.0, cast=float)
+# Intervalo (em segundos) entre verificações de saúde de cada réplica
+DB_REPLICA_HEALTH_CHECK_INTERVAL = config('DB_REPLICA_HEALTH_CHECK_INTERVAL', default=10.0, cast=float)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': config('DB_NAME', default='postgres'),
-        'USER': config('DB_USER', default='postgres'),
-        'PASSWORD': config('DB_PASSWORD', default='12345'),
-        'HOST': config('DB_HOST', default='localhost'),
-        'PORT': config('DB_PORT', default=5432),
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='login-projeto'),
     }
 }
 
+# Métricas em /metrics. Com vários workers, aponte METRICS_MULTIPROC_DIR para um
+# diretório compartilhado por eles (limpo a cada deploy); cada worker grava seus
+# totais ali a cada METRICS_FLUSH_INTERVAL segundos. Com METRICS_TOKEN, o endpoint
+# exige `Authorization: Bearer <token>`.
+METRICS_MULTIPROC_DIR = config('METRICS_MULTIPROC_DIR', default='')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5.0, cast=float)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Tempo máximo (em segundos) que as estatísticas de tarefas ficam em cache
+TASK_STATS_CACHE_TIMEOUT = config('TASK_STATS_CACHE_TIMEOUT', default=300, cast=int)
+
+# Tempo máximo (em segundos) que as listagens de tarefas ficam em cache
+TASK_RESPONSE_CACHE_TIMEOUT = config('TASK_RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+
+# Atraso (em segundos) com que a sincronização entrega as mudanças, maior que a
+# duração esperada de uma transação de escrita de tarefas
+TASK_SYNC_SAFETY_WINDOW = config('TASK_SYNC_SAFETY_WINDOW', default=1.0, cast=float)
+
+# Tarefas concluídas/canceladas há mais deste número de dias vão para o arquivo
+# (manage.py archive_tasks), em lotes deste tamanho
+TASK_ARCHIVE_AFTER_DAYS = config('TASK_ARCHIVE_AFTER_DAYS', default=180, cast=int)
+TASK_ARCHIVE_BATCH_SIZE = config('TASK_ARCHIVE_BATCH_SIZE', default=1000, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -1,5 +1,8 @@
 from django.urls import path, include
 
+from accounts.metrics import metrics_view
+
 urlpatterns = [
     path('api/', include('accounts.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
\ No newline at end of file